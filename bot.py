@@ -2,16 +2,33 @@ import asyncio
 import logging
 import sqlite3
 import os
+import random
+import secrets
+import signal
 import json
 import traceback
+from bisect import bisect_left, bisect_right
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from dotenv import load_dotenv
 from aiohttp import web
-from aiogram import Bot, Dispatcher, types, F
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import KeyboardButton, InlineKeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, ErrorEvent
+from aiogram import Bot, Dispatcher, BaseMiddleware, types, F
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.types import KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove, ErrorEvent, InputMediaPhoto
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import SendMediaGroup
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiogram.exceptions import (TelegramAPIError, TelegramBadRequest, TelegramForbiddenError,
+                                TelegramNetworkError, TelegramRetryAfter, TelegramServerError)
 
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from aiogram.filters import Command, StateFilter
@@ -28,10 +45,151 @@ API_TOKEN = os.getenv('API_TOKEN')
 CARD_NUMBER = os.getenv('CARD_NUMBER', '6262 4700 5534 4787')
 ADMIN_IDS = [5009858379, 587180281, 1225271746] 
 DB_FILENAME = 'football_shop.db'
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "wal").lower()  # wal | delete
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", min(8, (os.cpu_count() or 1) + 2)))
+DB_STATEMENT_CACHE_SIZE = 256
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 16384
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_GROUP_COMMIT_WINDOW_MS = int(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", 3))
+DB_GROUP_COMMIT_MAX_BATCH = 256
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "FULL").upper()  # FULL | NORMAL
+ORDER_ITEMS_BACKFILL_BATCH = 500
+CATALOG_VIEW = os.getenv("CATALOG_VIEW", "carousel")  # режим по умолчанию: carousel | album | list
+ALBUM_PAGE_SIZE = 10  # максимум фото в одном send_media_group
+ORDERS_PAGE_SIZE = 5
+ADMIN_ORDERS_PAGE_SIZE = 10
+ADMIN_NOTIFY_CONCURRENCY = 5
+SEND_GLOBAL_RATE = 30        # сообщений в секунду на весь бот
+SEND_CHAT_RATE = 1           # сообщений в секунду в личный чат
+SEND_GROUP_RATE = 20 / 60    # сообщений в секунду в группу
+SEND_CHAT_BURST = 3
+SEND_MAX_RETRIES = 4
+SEND_BACKOFF_BASE = 0.5
+SEND_CHAT_BUCKETS_MAX = 10000
+SEND_FLOOD_CHATS = 3         # 429 в стольких разных чатах...
+SEND_FLOOD_WINDOW = 10       # ...за столько секунд - флуд-контроль на весь бот
+BROADCAST_CHUNK_SIZE = 200   # получателей на одну порцию и одну запись прогресса
+BROADCAST_CONCURRENCY = 10   # держим небольшой запас, чтобы ответы пользователям не ждали рассылку
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 300
 PORT = int(os.getenv("PORT", 10000))
-
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()  # polling | webhook
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST") or os.getenv("RENDER_EXTERNAL_HOSTNAME")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+# Если секрет не задан, генерируем новый при каждом запуске - вебхук всё равно переустанавливается в main()
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+UPDATES_MAX_CONCURRENCY = int(os.getenv("UPDATES_MAX_CONCURRENCY", 20))
+FSM_CACHE_SIZE = 10000
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", 1.0))  # секунд между сбросами состояний в БД
+
+# ================== ХРАНИЛИЩЕ FSM ==================
+class SQLiteStorage(BaseStorage):
+    # Состояния переживают перезапуск: запись читается из SQLite один раз и дальше живёт в памяти,
+    # а изменения сбрасываются в БД одной пачкой раз в FSM_FLUSH_INTERVAL (write-behind).
+    # При аварийном падении теряются изменения только за последний интервал
+    def __init__(self):
+        self._records = OrderedDict()  # key -> (state, data), порядок LRU
+        self._dirty = set()
+        self._flushing = set()
+        self._flusher = None
+
+    @staticmethod
+    def _key(key):
+        return (f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:"
+                f"{key.business_connection_id or ''}:{key.destiny}")
+
+    async def _get(self, key):
+        k = self._key(key)
+        record = self._records.get(k)
+        if record is None:
+            loaded = await load_fsm_record(k)
+            # Пока читали, запись могла появиться - свежая версия в памяти важнее
+            record = self._records.setdefault(k, loaded or (None, {}))
+            self._evict(keep=k)
+        self._records.move_to_end(k)
+        return k, record
+
+    def _put(self, k, state, data):
+        self._records[k] = (state, data)
+        self._records.move_to_end(k)
+        self._dirty.add(k)
+
+    def _evict(self, keep):
+        # Вытесняем самые старые записи, но только уже сохранённые в БД
+        excess = len(self._records) - FSM_CACHE_SIZE
+        if excess <= 0:
+            return
+        pinned = self._dirty | self._flushing | {keep}
+        candidates = islice(self._records, excess + len(pinned))
+        for k in [k for k in candidates if k not in pinned][:excess]:
+            del self._records[k]
+
+    async def set_state(self, key, state=None):
+        k, (_, data) = await self._get(key)
+        self._put(k, state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key):
+        _, (state, _) = await self._get(key)
+        return state
+
+    async def set_data(self, key, data):
+        k, (state, _) = await self._get(key)
+        self._put(k, state, data.copy())
+
+    async def get_data(self, key):
+        _, (_, data) = await self._get(key)
+        return data.copy()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        self._flushing |= keys
+        skipped = set()
+        try:
+            upserts, deletes = [], []
+            for k in keys:
+                state, data = self._records[k]
+                if state is None and not data:
+                    deletes.append(k)
+                    continue
+                try:
+                    upserts.append((k, state, json.dumps(data, ensure_ascii=False)))
+                except (TypeError, ValueError) as e:
+                    # Повторная попытка ничего не даст - пропускаем запись, чтобы не блокировать остальные
+                    logger.error(f"Состояние FSM {k} не сериализуется в JSON: {e}")
+                    skipped.add(k)
+            await save_fsm_records(upserts, deletes)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить состояния FSM: {e}")
+            self._dirty |= keys - skipped
+        finally:
+            self._flushing -= keys
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FSM_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка фонового сохранения FSM: {e}")
+
+    def start(self):
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        # Вызывается и диспетчером при остановке polling, и из main(), поэтому повторный вызов безопасен
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+# ================== БОТ ==================
 bot = Bot(token=API_TOKEN)
-storage = MemoryStorage()
+storage = SQLiteStorage()
 dp = Dispatcher(storage=storage)
 
 @dp.error()
@@ -61,1807 +219,112 @@ async def error_handler(event: ErrorEvent):
         
     return True
 # ================== ДАННЫЕ ==================
-REGIONS = {
-            'ru': {
-                'tashkent': '📍 Ташкент (город)',
-                'andijan': '🏙️ Андижанская область',
-                'bukhara': '🏙️ Бухарская область',
-                'fergana': '🏙️ Ферганская область',
-                'jizzakh': '🏙️ Джизакская область',
-                'khorezm': '🏙️ Хорезмская область',
-                'namangan': '🏙️ Наманганская область',
-                'navoi': '🏙️ Навоийская область',
-                'kashkadarya': '🏙️ Кашкадарьинская область',
-                'samarkand': '🏙️ Самаркандская область',
-                'sirdarya': '🏙️ Сырдарьинская область',
-                'surkhandarya': '🏙️ Сурхандарьинская область',
-                'tashkent_region': '🏙️ Ташкентская область',
-                'karakalpakstan': '🏙️ Республика Каракалпакстан'
-            },
-            'uz': {
-                'tashkent': '📍 Toshkent (shahar)',
-                'andijan': '🏙️ Andijon viloyati',
-                'bukhara': '🏙️ Buxoro viloyati',
-                'fergana': '🏙️ Fargʻona viloyati',
-                'jizzakh': '🏙️ Jizzax viloyati',
-                'khorezm': '🏙️ Xorazm viloyati',
-                'namangan': '🏙️ Namangan viloyati',
-                'navoi': '🏙️ Navoiy viloyati',
-                'kashkadarya': '🏙️ Qashqadaryo viloyati',
-                'samarkand': '🏙️ Samarqand viloyati',
-                'sirdarya': '🏙️ Sirdaryo viloyati',
-                'surkhandarya': '🏙️ Surxondaryo viloyati',
-                'tashkent_region': '🏙️ Toshkent viloyati',
-                'karakalpakstan': '🏙️ Qoraqalpogʻiston Respublikasi'
-            }
-        }
-
-POST_OFFICES = {
-            'tashkent': {
-                'ru': ["Геолокация — курьер свяжется с вами"],
-                'uz': ["Joylashuv — kuryer siz bilan bog‘lanadi"]
-            },
-            'andijan': {
-                'ru': [
-                    {
-                        'name': 'АНДИЖАН ЦЕНТР - (г.Андижан)',
-                        'address': 'ул. Навои 45, ТЦ "Markaz"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaz_savdo_tsentr/108225791012'
-                    },
-                    {
-                        'name': 'АНДИЖАН БОЗОР - (г.Андижан)',
-                        'address': 'ул. Амира Темура 78, Рынок "Eski shahar"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_shahar_bazari/108225791013'
-                    },
-                    {
-                        'name': 'ХОНАБОД - (Ханабадский р-н)',
-                        'address': 'Ханабадский район, ул. Янгиобод 23, ТЦ "Xonabod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xonabod_savdo_tsentr/108225791014'
-                    },
-                    {
-                        'name': 'АСАКА - (Асакинский р-н)',
-                        'address': 'Асакинский район, ул. Парваз 12, ТЦ "Asaka"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/asaka_savdo_tsentr/108225791015'
-                    },
-                    {
-                        'name': 'ШАХРИХОН - (Шахриханский р-н)',
-                        'address': 'Шахриханский район, ул. Богишамол 34, Рынок "Shaxrixon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/shaxrixon_bazari/108225791016'
-                    },
-                    {
-                        'name': 'КУРГОНТЕПА - (Кургантепинский р-н)',
-                        'address': 'Кургантепинский район, ул. Янгихаёт 56, ТЦ "Qo\'rg\'ontepa"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorgontepa_savdo_tsentr/108225791017'
-                    },
-                    {
-                        'name': 'ПАХТАОБОД - (Пахтаабадский р-н)',
-                        'address': 'Пахтаабадский район, ул. Тинчлик 18, Рынок "Paxtaobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtaobod_bazari/108225791018'
-                    },
-                    {
-                        'name': 'БУЛОКБОШИ - (Булокбашинский р-н)',
-                        'address': 'Булокбашинский район, ул. Навбахор 29, ТЦ "Buloqboshi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/buloqboshi_savdo_tsentr/108225791019'
-                    },
-                    {
-                        'name': 'УЛУГНОР - (Улугнорский р-н)',
-                        'address': 'Улугнорский район, ул. Марказий 41, Рынок "Ulug\'nor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/ulugnor_bazari/108225791020'
-                    },
-                    {
-                        'name': 'ЖАЛАКУДУК - (Жалакудукский р-н)',
-                        'address': 'Жалакудукский район, ул. Янгиобод 15, ТЦ "Jalaquduq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/jalaquduq_savdo_tsentr/108225791021'
-                    },
-                    {
-                        'name': 'ХОДЖАОБОД - (Ходжаабадский р-н)',
-                        'address': 'Ходжаабадский район, ул. Богишамол 22, Рынок "Xo\'jaobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xojaobod_bazari/108225791022'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'ANDIJON MARKAZI - (Andijon sh.)',
-                        'address': 'Navoiy ko\'chasi 45, "Markaz" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaz_savdo_tsentr/108225791012'
-                    },
-                    {
-                        'name': 'ANDIJON BOZOR - (Andijon sh.)',
-                        'address': 'Amir Temur ko\'chasi 78, "Eski shahar" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_shahar_bazari/108225791013'
-                    },
-                    {
-                        'name': 'XONABOD - (Xonabod tumani)',
-                        'address': 'Xonabod tumani, Yangiobod ko\'chasi 23, "Xonabod" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xonabod_savdo_tsentr/108225791014'
-                    },
-                    {
-                        'name': 'ASAKA - (Asaka tumani)',
-                        'address': 'Asaka tumani, Parvoz ko\'chasi 12, "Asaka" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/asaka_savdo_tsentr/108225791015'
-                    },
-                    {
-                        'name': 'SHAHRIXON - (Shahrixon tumani)',
-                        'address': 'Shahrixon tumani, Bogishamol ko\'chasi 34, "Shahrixon" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/shaxrixon_bazari/108225791016'
-                    },
-                    {
-                        'name': 'QO\'RG\'ONTEPA - (Qo\'rg\'ontepa tumani)',
-                        'address': 'Qo\'rg\'ontepa tumani, Yangihayot ko\'chasi 56, "Qo\'rg\'ontepa" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorgontepa_savdo_tsentr/108225791017'
-                    },
-                    {
-                        'name': 'PAXTAOBOD - (Paxtaobod tumani)',
-                        'address': 'Paxtaobod tumani, Tinchlik ko\'chasi 18, "Paxtaobod" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtaobod_bazari/108225791018'
-                    },
-                    {
-                        'name': 'BULOQBOSHI - (Buloqboshi tumani)',
-                        'address': 'Buloqboshi tumani, Navbahor ko\'chasi 29, "Buloqboshi" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/buloqboshi_savdo_tsentr/108225791019'
-                    },
-                    {
-                        'name': 'ULUG\'NOR - (Ulug\'nor tumani)',
-                        'address': 'Ulug\'nor tumani, Markaziy ko\'chasi 41, "Ulug\'nor" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/ulugnor_bazari/108225791020'
-                    },
-                    {
-                        'name': 'JALAQUDUQ - (Jalaquduq tumani)',
-                        'address': 'Jalaquduq tumani, Yangiobod ko\'chasi 15, "Jalaquduq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/jalaquduq_savdo_tsentr/108225791021'
-                    },
-                    {
-                        'name': 'XO\'JAOBOD - (Xo\'jaobod tumani)',
-                        'address': 'Xo\'jaobod tumani, Bogishamol ko\'chasi 22, "Xo\'jaobod" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xojaobod_bazari/108225791022'
-                    }
-                ]
-            },
-            'bukhara': {
-                'ru': [
-                    {
-                        'name': 'БУХАРА ЦЕНТР - (г.Бухара)',
-                        'address': 'ул. Бахауддина Накшбанда 25, ТЦ "Bukhara"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/bukhara_savdo_tsentr/108225791023'
-                    },
-                    {
-                        'name': 'БУХАРА СТАРЫЙ ГОРОД - (г.Бухара)',
-                        'address': 'ул. Ходжа Нурабад 12, Рынок "Lyabi Khauz"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/lyabi_khauz_bazari/108225791024'
-                    },
-                    {
-                        'name': 'ГИЖДУВОН - (Гиждуванский р-н)',
-                        'address': 'Гиждуванский район, ул. Марказий 34, ТЦ "Gijduvon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/gijduvon_savdo_tsentr/108225791025'
-                    },
-                    {
-                        'name': 'КОГОН - (Коганский р-н)',
-                        'address': 'Коганский район, ул. Амира Темура 56, Рынок "Kogon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/kogon_bazari/108225791026'
-                    },
-                    {
-                        'name': 'ШАФИРКАН - (Шафирканский р-н)',
-                        'address': 'Шафирканский район, ул. Янгиобод 18, ТЦ "Shofirkon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/shofirkon_savdo_tsentr/108225791027'
-                    },
-                    {
-                        'name': 'КАРАКОЛ - (Каракульский р-н)',
-                        'address': 'Каракульский район, ул. Навбахор 29, Рынок "Qorako\'l"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorakol_bazari/108225791028'
-                    },
-                    {
-                        'name': 'ОЛОТ - (Олотский р-н)',
-                        'address': 'Олотский район, ул. Тинчлик 15, ТЦ "Olot"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/olot_savdo_tsentr/108225791029'
-                    },
-                    {
-                        'name': 'ПЕШКУ - (Пешкунский р-н)',
-                        'address': 'Пешкунский район, ул. Марказий 22, Рынок "Peshku"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/peshku_bazari/108225791030'
-                    },
-                    {
-                        'name': 'РОМИТАН - (Ромитанский р-н)',
-                        'address': 'Ромитанский район, ул. Богишамол 33, ТЦ "Romitan"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/romitan_savdo_tsentr/108225791031'
-                    },
-                    {
-                        'name': 'ЖОНДОР - (Жондорский р-н)',
-                        'address': 'Жондорский район, ул. Янгихаёт 14, Рынок "Jondor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/jondor_bazari/108225791032'
-                    },
-                    {
-                        'name': 'КОРАКУЛ - (Каракульский р-н)',
-                        'address': 'Каракульский район, ул. Амира Темура 41, ТЦ "Qorako\'l"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorakol_savdo_tsentr/108225791033'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'BUXORO MARKAZI - (Buxoro sh.)',
-                        'address': 'Bahouddin Naqshband ko\'chasi 25, "Buxoro" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/bukhara_savdo_tsentr/108225791023'
-                    },
-                    {
-                        'name': 'BUXORO ESKI SHAHAR - (Buxoro sh.)',
-                        'address': 'Xo\'ja Nurobod ko\'chasi 12, "Lyabi Xovuz" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/lyabi_khauz_bazari/108225791024'
-                    },
-                    {
-                        'name': 'GIJDUVON - (Gijduvon tumani)',
-                        'address': 'Gijduvon tumani, Markaziy ko\'chasi 34, "Gijduvon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/gijduvon_savdo_tsentr/108225791025'
-                    },
-                    {
-                        'name': 'KOGON - (Kogon tumani)',
-                        'address': 'Kogon tumani, Amir Temur ko\'chasi 56, "Kogon" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kogon_bazari/108225791026'
-                    },
-                    {
-                        'name': 'SHOFIRKON - (Shofirkon tumani)',
-                        'address': 'Shofirkon tumani, Yangiobod ko\'chasi 18, "Shofirkon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/shofirkon_savdo_tsentr/108225791027'
-                    },
-                    {
-                        'name': 'QORAKO\'L - (Qorako\'l tumani)',
-                        'address': 'Qorako\'l tumani, Navbahor ko\'chasi 29, "Qorako\'l" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorakol_bazari/108225791028'
-                    },
-                    {
-                        'name': 'OLOT - (Olot tumani)',
-                        'address': 'Olot tumani, Tinchlik ko\'chasi 15, "Olot" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/olot_savdo_tsentr/108225791029'
-                    },
-                    {
-                        'name': 'PESHKU - (Peshku tumani)',
-                        'address': 'Peshku tumani, Markaziy ko\'chasi 22, "Peshku" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/peshku_bazari/108225791030'
-                    },
-                    {
-                        'name': 'ROMITAN - (Romitan tumani)',
-                        'address': 'Romitan tumani, Bogishamol ko\'chasi 33, "Romitan" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/romitan_savdo_tsentr/108225791031'
-                    },
-                    {
-                        'name': 'JONDOR - (Jondor tumani)',
-                        'address': 'Jondor tumani, Yangihayot ko\'chasi 14, "Jondor" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/jondor_bazari/108225791032'
-                    },
-                    {
-                        'name': 'QORAKO\'L - (Qorako\'l tumani)',
-                        'address': 'Qorako\'l tumani, Amir Temur ko\'chasi 41, "Qorako\'l" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qorakol_savdo_tsentr/108225791033'
-                    }
-                ]
-            },
-            'fergana': {
-                'ru': [
-                    {
-                        'name': 'ФЕРГАНА ЦЕНТР - (г.Фергана)',
-                        'address': 'ул. Мустакиллик 45, ТЦ "Fargona"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/fargona_savdo_tsentr/108225791034'
-                    },
-                    {
-                        'name': 'ФЕРГАНА БОЗОР - (г.Фергана)',
-                        'address': 'ул. Амира Темура 78, Рынок "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_fargona/108225791035'
-                    },
-                    {
-                        'name': 'КУВАСОЙ - (г.Кувасай)',
-                        'address': 'ул. Навбахор 23, ТЦ "Quvasoy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/quvasoy_savdo_tsentr/108225791036'
-                    },
-                    {
-                        'name': 'МАРГИЛАН - (г.Маргилан)',
-                        'address': 'ул. Атлас 12, ТЦ "Margilon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/margilon_savdo_tsentr/108225791037'
-                    },
-                    {
-                        'name': 'КОКАНД - (г.Коканд)',
-                        'address': 'ул. Хамза 34, ТЦ "Qo\'qon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qoqon_savdo_tsentr/108225791038'
-                    },
-                    {
-                        'name': 'КУВА - (Кувинский р-н)',
-                        'address': 'Кувинский район, ул. Янгиобод 56, Рынок "Quva"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/quva_bazari/108225791039'
-                    },
-                    {
-                        'name': 'РИШТОН - (Риштанский р-н)',
-                        'address': 'Риштанский район, ул. Марказий 18, ТЦ "Rishton"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/rishton_savdo_tsentr/108225791040'
-                    },
-                    {
-                        'name': 'УЧКУПРИК - (Учкурганский р-н)',
-                        'address': 'Учкурганский район, ул. Тинчлик 29, Рынок "Uchqo\'rg\'on"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchqorgon_bazari/108225791041'
-                    },
-                    {
-                        'name': 'БЕШАРИК - (Бешарыкский р-н)',
-                        'address': 'Бешарыкский район, ул. Янгихаёт 41, ТЦ "Beshariq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/beshariq_savdo_tsentr/108225791042'
-                    },
-                    {
-                        'name': 'ДАНГАРА - (Дангаринский р-н)',
-                        'address': 'Дангаринский район, ул. Богишамол 15, Рынок "Dangara"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/dangara_bazari/108225791043'
-                    },
-                    {
-                        'name': 'ЯЗЯВАН - (Язъяванский р-н)',
-                        'address': 'Язъяванский район, ул. Марказий 22, ТЦ "Yozyovon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/yozyovon_savdo_tsentr/108225791044'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'FARG\'ONA MARKAZI - (Farg\'ona sh.)',
-                        'address': 'Mustaqillik ko\'chasi 45, "Farg\'ona" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/fargona_savdo_tsentr/108225791034'
-                    },
-                    {
-                        'name': 'FARG\'ONA BOZOR - (Farg\'ona sh.)',
-                        'address': 'Amir Temur ko\'chasi 78, "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_fargona/108225791035'
-                    },
-                    {
-                        'name': 'QUVASOY - (Quvasoy sh.)',
-                        'address': 'Navbahor ko\'chasi 23, "Quvasoy" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/quvasoy_savdo_tsentr/108225791036'
-                    },
-                    {
-                        'name': 'MARG\'ILON - (Marg\'ilon sh.)',
-                        'address': 'Atlas ko\'chasi 12, "Marg\'ilon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/margilon_savdo_tsentr/108225791037'
-                    },
-                    {
-                        'name': 'QO\'QON - (Qo\'qon sh.)',
-                        'address': 'Hamza ko\'chasi 34, "Qo\'qon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qoqon_savdo_tsentr/108225791038'
-                    },
-                    {
-                        'name': 'QUVA - (Quva tumani)',
-                        'address': 'Quva tumani, Yangiobod ko\'chasi 56, "Quva" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/quva_bazari/108225791039'
-                    },
-                    {
-                        'name': 'RISHTON - (Rishton tumani)',
-                        'address': 'Rishton tumani, Markaziy ko\'chasi 18, "Rishton" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/rishton_savdo_tsentr/108225791040'
-                    },
-                    {
-                        'name': 'UCHQO\'RG\'ON - (Uchqo\'rg\'on tumani)',
-                        'address': 'Uchqo\'rg\'on tumani, Tinchlik ko\'chasi 29, "Uchqo\'rg\'on" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchqorgon_bazari/108225791041'
-                    },
-                    {
-                        'name': 'BESHARIQ - (Beshariq tumani)',
-                        'address': 'Beshariq tumani, Yangihayot ko\'chasi 41, "Beshariq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/beshariq_savdo_tsentr/108225791042'
-                    },
-                    {
-                        'name': 'DANG\'ARA - (Dang\'ara tumani)',
-                        'address': 'Dang\'ara tumani, Bogishamol ko\'chasi 15, "Dang\'ara" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/dangara_bazari/108225791043'
-                    },
-                    {
-                        'name': 'YOZYOVON - (Yozyovon tumani)',
-                        'address': 'Yozyovon tumani, Markaziy ko\'chasi 22, "Yozyovon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/yozyovon_savdo_tsentr/108225791044'
-                    }
-                ]
-            },
-            'jizzakh': {
-                'ru': [
-                    {
-                        'name': 'ДЖИЗАК ЦЕНТР - (г.Джизак)',
-                        'address': 'ул. Амира Темура 45, ТЦ "Jizzax"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/jizzax_savdo_tsentr/108225791045'
-                    },
-                    {
-                        'name': 'ДЖИЗАК БОЗОР - (г.Джизак)',
-                        'address': 'ул. Навои 78, Рынок "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_jizzax/108225791046'
-                    },
-                    {
-                        'name': 'ГАЛЛАОРОЛ - (Галлаорольский р-н)',
-                        'address': 'Галлаорольский район, ул. Янгиобод 23, ТЦ "Gallaorol"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/gallaorol_savdo_tsentr/108225791047'
-                    },
-                    {
-                        'name': 'ПАХТАКОР - (Пахтакорский р-н)',
-                        'address': 'Пахтакорский район, ул. Марказий 12, ТЦ "Paxtakor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtakor_savdo_tsentr/108225791048'
-                    },
-                    {
-                        'name': 'ДУСТЛИК - (Дустликский р-н)',
-                        'address': 'Дустликский район, ул. Богишамол 34, Рынок "Do\'stlik"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/dostlik_bazari/108225791049'
-                    },
-                    {
-                        'name': 'ФАРИШ - (Фаришский р-н)',
-                        'address': 'Фаришский район, ул. Янгихаёт 56, ТЦ "Farish"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/farish_savdo_tsentr/108225791050'
-                    },
-                    {
-                        'name': 'ЗАФАРОБОД - (Зафарабадский р-н)',
-                        'address': 'Зафарабадский район, ул. Тинчлик 18, Рынок "Zafarobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/zafarobod_bazari/108225791051'
-                    },
-                    {
-                        'name': 'ЗАРБДОР - (Зарбдарский р-н)',
-                        'address': 'Зарбдарский район, ул. Навбахор 29, ТЦ "Zarbdor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/zarbdor_savdo_tsentr/108225791052'
-                    },
-                    {
-                        'name': 'МИРЗАЧУЛЬ - (Мирзачульский р-н)',
-                        'address': 'Мирзачульский район, ул. Марказий 41, Рынок "Mirzacho\'l"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/mirzachol_bazari/108225791053'
-                    },
-                    {
-                        'name': 'АРНАСОЙ - (Арнасайский р-н)',
-                        'address': 'Арнасайский район, ул. Янгиобод 15, ТЦ "Arnasoy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/arnasoy_savdo_tsentr/108225791054'
-                    },
-                    {
-                        'name': 'БАХМАЛ - (Бахмальский р-н)',
-                        'address': 'Бахмальский район, ул. Богишамол 22, Рынок "Baxmal"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/baxmal_bazari/108225791055'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'JIZZAX MARKAZI - (Jizzax sh.)',
-                        'address': 'Amir Temur ko\'chasi 45, "Jizzax" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/jizzax_savdo_tsentr/108225791045'
-                    },
-                    {
-                        'name': 'JIZZAX BOZOR - (Jizzax sh.)',
-                        'address': 'Navoiy ko\'chasi 78, "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_jizzax/108225791046'
-                    },
-                    {
-                        'name': 'GALLAOROL - (Gallaorol tumani)',
-                        'address': 'Gallaorol tumani, Yangiobod ko\'chasi 23, "Gallaorol" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/gallaorol_savdo_tsentr/108225791047'
-                    },
-                    {
-                        'name': 'PAXTAKOR - (Paxtakor tumani)',
-                        'address': 'Paxtakor tumani, Markaziy ko\'chasi 12, "Paxtakor" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtakor_savdo_tsentr/108225791048'
-                    },
-                    {
-                        'name': 'DO\'STLIK - (Do\'stlik tumani)',
-                        'address': 'Do\'stlik tumani, Bogishamol ko\'chasi 34, "Do\'stlik" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/dostlik_bazari/108225791049'
-                    },
-                    {
-                        'name': 'FARISH - (Farish tumani)',
-                        'address': 'Farish tumani, Yangihayot ko\'chasi 56, "Farish" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/farish_savdo_tsentr/108225791050'
-                    },
-                    {
-                        'name': 'ZAFAROBOD - (Zafarobod tumani)',
-                        'address': 'Zafarobod tumani, Tinchlik ko\'chasi 18, "Zafarobod" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/zafarobod_bazari/108225791051'
-                    },
-                    {
-                        'name': 'ZARBDOR - (Zarbdor tumani)',
-                        'address': 'Zarbdor tumani, Navbahor ko\'chasi 29, "Zarbdor" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/zarbdor_savdo_tsentr/108225791052'
-                    },
-                    {
-                        'name': 'MIRZACHO\'L - (Mirzacho\'l tumani)',
-                        'address': 'Mirzacho\'l tumani, Markaziy ko\'chasi 41, "Mirzacho\'l" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/mirzachol_bazari/108225791053'
-                    },
-                    {
-                        'name': 'ARNASOY - (Arnasoy tumani)',
-                        'address': 'Arnasoy tumani, Yangiobod ko\'chasi 15, "Arnasoy" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/arnasoy_savdo_tsentr/108225791054'
-                    },
-                    {
-                        'name': 'BAXMAL - (Baxmal tumani)',
-                        'address': 'Baxmal tumani, Bogishamol ko\'chasi 22, "Baxmal" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/baxmal_bazari/108225791055'
-                    }
-                ]
-            },
-            'khorezm': {
-                'ru': [
-                    {
-                        'name': 'УРГЕНЧ ЦЕНТР - (г.Ургенч)',
-                        'address': 'ул. Аль-Хорезми 45, ТЦ "Urganch"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/urganch_savdo_tsentr/108225791056'
-                    },
-                    {
-                        'name': 'УРГЕНЧ БОЗОР - (г.Ургенч)',
-                        'address': 'ул. Беруни 78, Рынок "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_urganch/108225791057'
-                    },
-                    {
-                        'name': 'ХИВА - (г.Хива)',
-                        'address': 'ул. Пахлавона Махмуда 23, ТЦ "Xiva"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xiva_savdo_tsentr/108225791058'
-                    },
-                    {
-                        'name': 'ПИТНАК - (Питнакский р-н)',
-                        'address': 'Питнакский район, ул. Марказий 12, ТЦ "Pitnak"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/pitnak_savdo_tsentr/108225791059'
-                    },
-                    {
-                        'name': 'ГУРЛАН - (Гурленский р-н)',
-                        'address': 'Гурленский район, ул. Богишамол 34, Рынок "Gurlan"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/gurlan_bazari/108225791060'
-                    },
-                    {
-                        'name': 'ХОНКА - (Хонкинский р-н)',
-                        'address': 'Хонкинский район, ул. Янгихаёт 56, ТЦ "Xonqa"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xonqa_savdo_tsentr/108225791061'
-                    },
-                    {
-                        'name': 'ХАЗОРАСП - (Хазараспский р-н)',
-                        'address': 'Хазараспский район, ул. Тинчлик 18, Рынок "Xazorasp"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xazorasp_bazari/108225791062'
-                    },
-                    {
-                        'name': 'ШАВАТ - (Шаватский р-н)',
-                        'address': 'Шаватский район, ул. Навбахор 29, ТЦ "Shovot"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/shavat_savdo_tsentr/108225791063'
-                    },
-                    {
-                        'name': 'ЯНГИАРЫК - (Янгиарыкский р-н)',
-                        'address': 'Янгиарыкский район, ул. Марказий 41, Рынок "Yangiarik"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiarik_bazari/108225791064'
-                    },
-                    {
-                        'name': 'ЯНГИБОЗОР - (Янгибазарский р-н)',
-                        'address': 'Янгибазарский район, ул. Янгиобод 15, ТЦ "Yangibozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangibozor_savdo_tsentr/108225791065'
-                    },
-                    {
-                        'name': 'БОГОТ - (Боготский р-н)',
-                        'address': 'Боготский район, ул. Богишамол 22, Рынок "Bogot"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/bogot_bazari/108225791066'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'URGANCH MARKAZI - (Urganch sh.)',
-                        'address': 'Al-Xorazmiy ko\'chasi 45, "Urganch" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/urganch_savdo_tsentr/108225791056'
-                    },
-                    {
-                        'name': 'URGANCH BOZOR - (Urganch sh.)',
-                        'address': 'Beruniy ko\'chasi 78, "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_urganch/108225791057'
-                    },
-                    {
-                        'name': 'XIVA - (Xiva sh.)',
-                        'address': 'Pahlavon Mahmud ko\'chasi 23, "Xiva" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xiva_savdo_tsentr/108225791058'
-                    },
-                    {
-                        'name': 'PITNAQ - (Pitnaq tumani)',
-                        'address': 'Pitnaq tumani, Markaziy ko\'chasi 12, "Pitnaq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/pitnak_savdo_tsentr/108225791059'
-                    },
-                    {
-                        'name': 'GURLAN - (Gurlan tumani)',
-                        'address': 'Gurlan tumani, Bogishamol ko\'chasi 34, "Gurlan" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/gurlan_bazari/108225791060'
-                    },
-                    {
-                        'name': 'XONQA - (Xonqa tumani)',
-                        'address': 'Xonqa tumani, Yangihayot ko\'chasi 56, "Xonqa" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xonqa_savdo_tsentr/108225791061'
-                    },
-                    {
-                        'name': 'XAZORASP - (Xazorasp tumani)',
-                        'address': 'Xazorasp tumani, Tinchlik ko\'chasi 18, "Xazorasp" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xazorasp_bazari/108225791062'
-                    },
-                    {
-                        'name': 'SHOVOT - (Shovot tumani)',
-                        'address': 'Shovot tumani, Navbahor ko\'chasi 29, "Shovot" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/shavat_savdo_tsentr/108225791063'
-                    },
-                    {
-                        'name': 'YANGIARIK - (Yangiarik tumani)',
-                        'address': 'Yangiarik tumani, Markaziy ko\'chasi 41, "Yangiarik" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiarik_bazari/108225791064'
-                    },
-                    {
-                        'name': 'YANGIBOZOR - (Yangibozor tumani)',
-                        'address': 'Yangibozor tumani, Yangiobod ko\'chasi 15, "Yangibozor" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangibozor_savdo_tsentr/108225791065'
-                    },
-                    {
-                        'name': 'BOGOT - (Bogot tumani)',
-                        'address': 'Bogot tumani, Bogishamol ko\'chasi 22, "Bogot" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/bogot_bazari/108225791066'
-                    }
-                ]
-            },
-            'namangan': {
-                'ru': [
-                    {
-                        'name': 'НАМАНГАН ЦЕНТР - (г.Наманган)',
-                        'address': 'ул. Амира Темура 45, ТЦ "Namangan"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/namangan_savdo_tsentr/108225791067'
-                    },
-                    {
-                        'name': 'НАМАНГАН БОЗОР - (г.Наманган)',
-                        'address': 'ул. Навои 78, Рынок "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_namangan/108225791068'
-                    },
-                    {
-                        'name': 'КОСОНСОЙ - (Касансайский р-н)',
-                        'address': 'Касансайский район, ул. Янгиобод 23, ТЦ "Kosonsoy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/kosonsoy_savdo_tsentr/108225791069'
-                    },
-                    {
-                        'name': 'ЧУСТ - (Чустский р-н)',
-                        'address': 'Чустский район, ул. Марказий 12, ТЦ "Chust"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/chust_savdo_tsentr/108225791070'
-                    },
-                    {
-                        'name': 'ПОП - (Папский р-н)',
-                        'address': 'Папский район, ул. Богишамол 34, Рынок "Pop"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/pop_bazari/108225791071'
-                    },
-                    {
-                        'name': 'УЙЧИ - (Уйчинский р-н)',
-                        'address': 'Уйчинский район, ул. Янгихаёт 56, ТЦ "Uychi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/uychi_savdo_tsentr/108225791072'
-                    },
-                    {
-                        'name': 'УЧКУРГОН - (Учкурганский р-н)',
-                        'address': 'Учкурганский район, ул. Тинчлик 18, Рынок "Uchqo\'rg\'on"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchqorgon_bazari/108225791073'
-                    },
-                    {
-                        'name': 'МИНГБУЛОК - (Мингбулакский р-н)',
-                        'address': 'Мингбулакский район, ул. Навбахор 29, ТЦ "Mingbuloq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/mingbuloq_savdo_tsentr/108225791074'
-                    },
-                    {
-                        'name': 'ЯНГИКУРГОН - (Янгикурганский р-н)',
-                        'address': 'Янгикурганский район, ул. Марказий 41, Рынок "Yangiqo\'rg\'on"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiqorgon_bazari/108225791075'
-                    },
-                    {
-                        'name': 'НОРИН - (Норинский р-н)',
-                        'address': 'Норинский район, ул. Янгиобод 15, ТЦ "Norin"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/norin_savdo_tsentr/108225791076'
-                    },
-                    {
-                        'name': 'ЧОРТОК - (Чартакский р-н)',
-                        'address': 'Чартакский район, ул. Богишамол 22, Рынок "Chortoq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/chortoq_bazari/108225791077'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'NAMANGAN MARKAZI - (Namangan sh.)',
-                        'address': 'Amir Temur ko\'chasi 45, "Namangan" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/namangan_savdo_tsentr/108225791067'
-                    },
-                    {
-                        'name': 'NAMANGAN BOZOR - (Namangan sh.)',
-                        'address': 'Navoiy ko\'chasi 78, "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_namangan/108225791068'
-                    },
-                    {
-                        'name': 'KOSONSOY - (Kosonsoy tumani)',
-                        'address': 'Kosonsoy tumani, Yangiobod ko\'chasi 23, "Kosonsoy" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kosonsoy_savdo_tsentr/108225791069'
-                    },
-                    {
-                        'name': 'CHUST - (Chust tumani)',
-                        'address': 'Chust tumani, Markaziy ko\'chasi 12, "Chust" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/chust_savdo_tsentr/108225791070'
-                    },
-                    {
-                        'name': 'POP - (Pop tumani)',
-                        'address': 'Pop tumani, Bogishamol ko\'chasi 34, "Pop" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/pop_bazari/108225791071'
-                    },
-                    {
-                        'name': 'UYCHI - (Uychi tumani)',
-                        'address': 'Uychi tumani, Yangihayot ko\'chasi 56, "Uychi" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/uychi_savdo_tsentr/108225791072'
-                    },
-                    {
-                        'name': 'UCHQO\'RG\'ON - (Uchqo\'rg\'on tumani)',
-                        'address': 'Uchqo\'rg\'on tumani, Tinchlik ko\'chasi 18, "Uchqo\'rg\'on" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchqorgon_bazari/108225791073'
-                    },
-                    {
-                        'name': 'MINGBULOQ - (Mingbuloq tumani)',
-                        'address': 'Mingbuloq tumani, Navbahor ko\'chasi 29, "Mingbuloq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/mingbuloq_savdo_tsentr/108225791074'
-                    },
-                    {
-                        'name': 'YANGIQO\'RG\'ON - (Yangiqo\'rg\'on tumani)',
-                        'address': 'Yangiqo\'rg\'on tumani, Markaziy ko\'chasi 41, "Yangiqo\'rg\'on" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiqorgon_bazari/108225791075'
-                    },
-                    {
-                        'name': 'NORIN - (Norin tumani)',
-                        'address': 'Norin tumani, Yangiobod ko\'chasi 15, "Norin" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/norin_savdo_tsentr/108225791076'
-                    },
-                    {
-                        'name': 'CHORTOQ - (Chortoq tumani)',
-                        'address': 'Chortoq tumani, Bogishamol ko\'chasi 22, "Chortoq" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/chortoq_bazari/108225791077'
-                    }
-                ]
-            },
-            'navoi': {
-                'ru': [
-                    {
-                        'name': 'НАВОИ ЦЕНТР - (г.Навои)',
-                        'address': 'ул. Алишера Навои 45, ТЦ "Navoiy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/navoiy_savdo_tsentr/108225791078'
-                    },
-                    {
-                        'name': 'НАВОИ БОЗОР - (г.Навои)',
-                        'address': 'ул. Амира Темура 78, Рынок "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_navoi/108225791079'
-                    },
-                    {
-                        'name': 'ЗАРАФШАН - (г.Зарафшан)',
-                        'address': 'ул. Янгиобод 23, ТЦ "Zarafshon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/zarafshon_savdo_tsentr/108225791080'
-                    },
-                    {
-                        'name': 'УЧКУДУК - (Учкудукский р-н)',
-                        'address': 'Учкудукский район, ул. Марказий 12, ТЦ "Uchquduq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchquduq_savdo_tsentr/108225791081'
-                    },
-                    {
-                        'name': 'КАРМАНА - (Карманский р-н)',
-                        'address': 'Карманский район, ул. Богишамол 34, Рынок "Qarmana"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qarmana_bazari/108225791082'
-                    },
-                    {
-                        'name': 'КЫЗЫЛТЕПА - (Кызылтепинский р-н)',
-                        'address': 'Кызылтепинский район, ул. Янгихаёт 56, ТЦ "Qiziltepa"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qiziltepa_savdo_tsentr/108225791083'
-                    },
-                    {
-                        'name': 'НОРОТАН - (Нуратинский р-н)',
-                        'address': 'Нуратинский район, ул. Тинчлик 18, Рынок "Nurota"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/nurota_bazari/108225791084'
-                    },
-                    {
-                        'name': 'ХАТЫРЧИ - (Хатырчинский р-н)',
-                        'address': 'Хатырчинский район, ул. Навбахор 29, ТЦ "Xatirchi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xatirchi_savdo_tsentr/108225791085'
-                    },
-                    {
-                        'name': 'ТОМДИ - (Томдыбулакский р-н)',
-                        'address': 'Томдыбулакский район, ул. Марказий 41, Рынок "Tomdi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/tomdi_bazari/108225791086'
-                    },
-                    {
-                        'name': 'КОНИМЕХ - (Конимехский р-н)',
-                        'address': 'Конимехский район, ул. Янгиобод 15, ТЦ "Konimex"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/konimex_savdo_tsentr/108225791087'
-                    },
-                    {
-                        'name': 'НАВБАХОР - (Навбахорский р-н)',
-                        'address': 'Навбахорский район, ул. Богишамол 22, Рынок "Navbahor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/navbahor_bazari/108225791088'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'NAVOIY MARKAZI - (Navoiy sh.)',
-                        'address': 'Alisher Navoiy ko\'chasi 45, "Navoiy" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/navoiy_savdo_tsentr/108225791078'
-                    },
-                    {
-                        'name': 'NAVOIY BOZOR - (Navoiy sh.)',
-                        'address': 'Amir Temur ko\'chasi 78, "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_navoi/108225791079'
-                    },
-                    {
-                        'name': 'ZARAFSHON - (Zarafshon sh.)',
-                        'address': 'Yangiobod ko\'chasi 23, "Zarafshon" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/zarafshon_savdo_tsentr/108225791080'
-                    },
-                    {
-                        'name': 'UCHQUDUQ - (Uchquduq tumani)',
-                        'address': 'Uchquduq tumani, Markaziy ko\'chasi 12, "Uchquduq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/uchquduq_savdo_tsentr/108225791081'
-                    },
-                    {
-                        'name': 'QARMANA - (Qarmana tumani)',
-                        'address': 'Qarmana tumani, Bogishamol ko\'chasi 34, "Qarmana" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qarmana_bazari/108225791082'
-                    },
-                    {
-                        'name': 'QIZILTEPA - (Qiziltepa tumani)',
-                        'address': 'Qiziltepa tumani, Yangihayot ko\'chasi 56, "Qiziltepa" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qiziltepa_savdo_tsentr/108225791083'
-                    },
-                    {
-                        'name': 'NUROTA - (Nurota tumani)',
-                        'address': 'Nurota tumani, Tinchlik ko\'chasi 18, "Nurota" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/nurota_bazari/108225791084'
-                    },
-                    {
-                        'name': 'XATIRCHI - (Xatirchi tumani)',
-                        'address': 'Xatirchi tumani, Navbahor ko\'chasi 29, "Xatirchi" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xatirchi_savdo_tsentr/108225791085'
-                    },
-                    {
-                        'name': 'TOMDI - (Tomdi tumani)',
-                        'address': 'Tomdi tumani, Markaziy ko\'chasi 41, "Tomdi" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/tomdi_bazari/108225791086'
-                    },
-                    {
-                        'name': 'KONIMEX - (Konimex tumani)',
-                        'address': 'Konimex tumani, Yangiobod ko\'chasi 15, "Konimex" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/konimex_savdo_tsentr/108225791087'
-                    },
-                    {
-                        'name': 'NAVBAHOR - (Navbahor tumani)',
-                        'address': 'Navbahor tumani, Bogishamol ko\'chasi 22, "Navbahor" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/navbahor_bazari/108225791088'
-                    }
-                ]
-            },
-            'kashkadarya': {
-                'ru': [
-                    {
-                        'name': 'КАРШИ ЦЕНТР - (г.Карши)',
-                        'address': 'ул. Амира Темура 45, ТЦ "Qarshi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qarshi_savdo_tsentr/108225791089'
-                    },
-                    {
-                        'name': 'КАРШИ БОЗОР - (г.Карши)',
-                        'address': 'ул. Навои 78, Рынок "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_qarshi/108225791090'
-                    },
-                    {
-                        'name': 'ШАХРИСАБЗ - (г.Шахрисабз)',
-                        'address': 'ул. Амира Темура 23, ТЦ "Shahrisabz"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/shahrisabz_savdo_tsentr/108225791091'
-                    },
-                    {
-                        'name': 'КИТОБ - (Китабский р-н)',
-                        'address': 'Китабский район, ул. Марказий 12, ТЦ "Kitob"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/kitob_savdo_tsentr/108225791092'
-                    },
-                    {
-                        'name': 'ГУЗАР - (Гузарский р-н)',
-                        'address': 'Гузарский район, ул. Богишамол 34, Рынок "Guzar"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/guzar_bazari/108225791093'
-                    },
-                    {
-                        'name': 'ДЕХКАНАБАД - (Дехканабадский р-н)',
-                        'address': 'Дехканабадский район, ул. Янгихаёт 56, ТЦ "Dehqonobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/dehqonobod_savdo_tsentr/108225791094'
-                    },
-                    {
-                        'name': 'КАМАШИ - (Камашинский р-н)',
-                        'address': 'Камашинский район, ул. Тинчлик 18, Рынок "Qamashi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qamashi_bazari/108225791095'
-                    },
-                    {
-                        'name': 'КАСАН - (Кассанский р-н)',
-                        'address': 'Кассанский район, ул. Навбахор 29, ТЦ "Qasan"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qasan_savdo_tsentr/108225791096'
-                    },
-                    {
-                        'name': 'КУКДАЛА - (Кукдалинский р-н)',
-                        'address': 'Кукдалинский район, ул. Марказий 41, Рынок "Qoqdola"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/qoqdola_bazari/108225791097'
-                    },
-                    {
-                        'name': 'МИРИШКОР - (Миришкорский р-н)',
-                        'address': 'Миришкорский район, ул. Янгиобод 15, ТЦ "Mirishkor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/mirishkor_savdo_tsentr/108225791098'
-                    },
-                    {
-                        'name': 'МУБОРАК - (Мубарекский р-н)',
-                        'address': 'Мубарекский район, ул. Богишамол 22, Рынок "Muborak"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/muborak_bazari/108225791099'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'QARSHI MARKAZI - (Qarshi sh.)',
-                        'address': 'Amir Temur ko\'chasi 45, "Qarshi" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qarshi_savdo_tsentr/108225791089'
-                    },
-                    {
-                        'name': 'QARSHI BOZOR - (Qarshi sh.)',
-                        'address': 'Navoiy ko\'chasi 78, "Eski bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/eski_bozor_qarshi/108225791090'
-                    },
-                    {
-                        'name': 'SHAHRISABZ - (Shahrisabz sh.)',
-                        'address': 'Amir Temur ko\'chasi 23, "Shahrisabz" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/shahrisabz_savdo_tsentr/108225791091'
-                    },
-                    {
-                        'name': 'KITOB - (Kitob tumani)',
-                        'address': 'Kitob tumani, Markaziy ko\'chasi 12, "Kitob" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kitob_savdo_tsentr/108225791092'
-                    },
-                    {
-                        'name': 'GUZAR - (Guzar tumani)',
-                        'address': 'Guzar tumani, Bogishamol ko\'chasi 34, "Guzar" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/guzar_bazari/108225791093'
-                    },
-                    {
-                        'name': 'DEHQONOBOD - (Dehqonobod tumani)',
-                        'address': 'Dehqonobod tumani, Yangihayot ko\'chasi 56, "Dehqonobod" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/dehqonobod_savdo_tsentr/108225791094'
-                    },
-                    {
-                        'name': 'QAMASHI - (Qamashi tumani)',
-                        'address': 'Qamashi tumani, Tinchlik ko\'chasi 18, "Qamashi" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qamashi_bazari/108225791095'
-                    },
-                    {
-                        'name': 'QASAN - (Qasan tumani)',
-                        'address': 'Qasan tumani, Navbahor ko\'chasi 29, "Qasan" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qasan_savdo_tsentr/108225791096'
-                    },
-                    {
-                        'name': 'QOQDOLA - (Qoqdola tumani)',
-                        'address': 'Qoqdola tumani, Markaziy ko\'chasi 41, "Qoqdola" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/qoqdola_bazari/108225791097'
-                    },
-                    {
-                        'name': 'MIRISHKOR - (Mirishkor tumani)',
-                        'address': 'Mirishkor tumani, Yangiobod ko\'chasi 15, "Mirishkor" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/mirishkor_savdo_tsentr/108225791098'
-                    },
-                    {
-                        'name': 'MUBORAK - (Muborak tumani)',
-                        'address': 'Muborak tumani, Bogishamol ko\'chasi 22, "Muborak" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/muborak_bazari/108225791099'
-                    }
-                ]
-            },
-            'samarkand': {
-                'ru': [
-                    {
-                        'name': 'САМАРКАНД ЦЕНТР - (г.Самарканд)',
-                        'address': 'ул. Регистан 45, ТЦ "Samarqand"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/samarqand_savdo_tsentr/108225791100'
-                    },
-                    {
-                        'name': 'САМАРКАНД СИЯБ - (г.Самарканд)',
-                        'address': 'ул. Амира Темура 78, Рынок "Siyob bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/siyob_bozor/108225791101'
-                    },
-                    {
-                        'name': 'КАТТАКУРГАН - (г.Каттакурган)',
-                        'address': 'ул. Янгиобод 23, ТЦ "Kattaqo\'rg\'on"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/kattaqorgon_savdo_tsentr/108225791102'
-                    },
-                    {
-                        'name': 'УРГУТ - (Ургутский р-н)',
-                        'address': 'Ургутский район, ул. Марказий 12, ТЦ "Urgut"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/urgut_savdo_tsentr/108225791103'
-                    },
-                    {
-                        'name': 'БУЛУНГУР - (Булунгурский р-н)',
-                        'address': 'Булунгурский район, ул. Богишамол 34, Рынок "Bulung\'ur"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/bulungur_bazari/108225791104'
-                    },
-                    {
-                        'name': 'ДЖАМБАЙ - (Джамбайский р-н)',
-                        'address': 'Джамбайский район, ул. Янгихаёт 56, ТЦ "Jomboy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/jomboy_savdo_tsentr/108225791105'
-                    },
-                    {
-                        'name': 'ИШТИХОН - (Иштиханский р-н)',
-                        'address': 'Иштиханский район, ул. Тинчлик 18, Рынок "Ishtixon"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/ishtixon_bazari/108225791106'
-                    },
-                    {
-                        'name': 'КАЛЛАСОЙ - (Пайарыкский р-н)',
-                        'address': 'Пайарыкский район, ул. Навбахор 29, ТЦ "Payariq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/payariq_savdo_tsentr/108225791107'
-                    },
-                    {
-                        'name': 'НУРАБАД - (Нурабадский р-н)',
-                        'address': 'Нурабадский район, ул. Марказий 41, Рынок "Nurobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/nurobod_bazari/108225791108'
-                    },
-                    {
-                        'name': 'ПАХТАЧИ - (Пахтачийский р-н)',
-                        'address': 'Пахтачийский район, ул. Янгиобод 15, ТЦ "Paxtachi"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtachi_savdo_tsentr/108225791109'
-                    },
-                    {
-                        'name': 'ТАЙЛЯК - (Тайлякский р-н)',
-                        'address': 'Тайлякский район, ул. Богишамол 22, Рынок "Toyloq"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/toyloq_bazari/108225791110'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'SAMARQAND MARKAZI - (Samarqand sh.)',
-                        'address': 'Registon ko\'chasi 45, "Samarqand" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/samarqand_savdo_tsentr/108225791100'
-                    },
-                    {
-                        'name': 'SAMARQAND SIYOB - (Samarqand sh.)',
-                        'address': 'Amir Temur ko\'chasi 78, "Siyob bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/siyob_bozor/108225791101'
-                    },
-                    {
-                        'name': 'KATTAQO\'RG\'ON - (Kattaqo\'rg\'on sh.)',
-                        'address': 'Yangiobod ko\'chasi 23, "Kattaqo\'rg\'on" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kattaqorgon_savdo_tsentr/108225791102'
-                    },
-                    {
-                        'name': 'URGUT - (Urgut tumani)',
-                        'address': 'Urgut tumani, Markaziy ko\'chasi 12, "Urgut" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/urgut_savdo_tsentr/108225791103'
-                    },
-                    {
-                        'name': 'BULUNG\'UR - (Bulung\'ur tumani)',
-                        'address': 'Bulung\'ur tumani, Bogishamol ko\'chasi 34, "Bulung\'ur" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/bulungur_bazari/108225791104'
-                    },
-                    {
-                        'name': 'JOMBOY - (Jomboy tumani)',
-                        'address': 'Jomboy tumani, Yangihayot ko\'chasi 56, "Jomboy" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/jomboy_savdo_tsentr/108225791105'
-                    },
-                    {
-                        'name': 'ISHTIXON - (Ishtixon tumani)',
-                        'address': 'Ishtixon tumani, Tinchlik ko\'chasi 18, "Ishtixon" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/ishtixon_bazari/108225791106'
-                    },
-                    {
-                        'name': 'PAYARIQ - (Payariq tumani)',
-                        'address': 'Payariq tumani, Navbahor ko\'chasi 29, "Payariq" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/payariq_savdo_tsentr/108225791107'
-                    },
-                    {
-                        'name': 'NUROBOD - (Nurobod tumani)',
-                        'address': 'Nurobod tumani, Markaziy ko\'chasi 41, "Nurobod" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/nurobod_bazari/108225791108'
-                    },
-                    {
-                        'name': 'PAXTACHI - (Paxtachi tumani)',
-                        'address': 'Paxtachi tumani, Yangiobod ko\'chasi 15, "Paxtachi" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/paxtachi_savdo_tsentr/108225791109'
-                    },
-                    {
-                        'name': 'TOYLOQ - (Toyloq tumani)',
-                        'address': 'Toyloq tumani, Bogishamol ko\'chasi 22, "Toyloq" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/toyloq_bazari/108225791110'
-                    }
-                ]
-            },
-            'sirdarya': {
-                'ru': [
-                    {
-                        'name': 'ГУЛИСТАН ЦЕНТР - (г.Гулистан)',
-                        'address': 'ул. Амира Темура 45, ТЦ "Guliston"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/guliston_savdo_tsentr/108225791111'
-                    },
-                    {
-                        'name': 'ГУЛИСТАН БОЗОР - (г.Гулистан)',
-                        'address': 'ул. Навои 78, Рынок "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_guliston/108225791112'
-                    },
-                    {
-                        'name': 'ЯНГИЕР - (г.Янгиер)',
-                        'address': 'ул. Янгиобод 23, ТЦ "Yangiyer"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiyer_savdo_tsentr/108225791113'
-                    },
-                    {
-                        'name': 'ШИРИН - (Ширинский р-н)',
-                        'address': 'Ширинский район, ул. Марказий 12, ТЦ "Shirin"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/shirin_savdo_tsentr/108225791114'
-                    },
-                    {
-                        'name': 'САРДОБА - (Сардобинский р-н)',
-                        'address': 'Сардобинский район, ул. Богишамол 34, Рынок "Sardoba"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/sardoba_bazari/108225791115'
-                    },
-                    {
-                        'name': 'САЙХУНОБОД - (Сайхунабадский р-н)',
-                        'address': 'Сайхунабадский район, ул. Янгихаёт 56, ТЦ "Sayxunobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/sayxunobod_savdo_tsentr/108225791116'
-                    },
-                    {
-                        'name': 'ХАВАСТ - (Хавастский р-н)',
-                        'address': 'Хавастский район, ул. Тинчлик 18, Рынок "Xovos"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/xovos_bazari/108225791117'
-                    },
-                    {
-                        'name': 'МЕХНАТАБАД - (Мирзаабадский р-н)',
-                        'address': 'Мирзаабадский район, ул. Навбахор 29, ТЦ "Mehnatobod"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/mehnatobod_savdo_tsentr/108225791118'
-                    },
-                    {
-                        'name': 'ГУЛИСТОН ШАХАР - (Гулистанский р-н)',
-                        'address': 'Гулистанский район, ул. Марказий 41, Рынок "Guliston"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/guliston_bazari/108225791119'
-                    },
-                    {
-                        'name': 'ОКОЛТИН - (Акалтынский р-н)',
-                        'address': 'Акалтынский район, ул. Янгиобод 15, ТЦ "Oqoltin"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/oqoltin_savdo_tsentr/108225791120'
-                    },
-                    {
-                        'name': 'БАЯУТ - (Баяутский р-н)',
-                        'address': 'Баяутский район, ул. Богишамол 22, Рынок "Boyovut"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходной',
-                        'yandex_map': 'https://yandex.uz/maps/org/boyovut_bazari/108225791121'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'GULISTON MARKAZI - (Guliston sh.)',
-                        'address': 'Amir Temur ko\'chasi 45, "Guliston" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/guliston_savdo_tsentr/108225791111'
-                    },
-                    {
-                        'name': 'GULISTON BOZOR - (Guliston sh.)',
-                        'address': 'Navoiy ko\'chasi 78, "Markaziy bozor"',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/markaziy_bozor_guliston/108225791112'
-                    },
-                    {
-                        'name': 'YANGIYER - (Yangiyer sh.)',
-                        'address': 'Yangiobod ko\'chasi 23, "Yangiyer" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/yangiyer_savdo_tsentr/108225791113'
-                    },
-                    {
-                        'name': 'SHIRIN - (Shirin tumani)',
-                        'address': 'Shirin tumani, Markaziy ko\'chasi 12, "Shirin" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/shirin_savdo_tsentr/108225791114'
-                    },
-                    {
-                        'name': 'SARDORA - (Sardoba tumani)',
-                        'address': 'Sardoba tumani, Bogishamol ko\'chasi 34, "Sardoba" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/sardoba_bazari/108225791115'
-                    },
-                    {
-                        'name': 'SAYXUNOBOD - (Sayxunobod tumani)',
-                        'address': 'Sayxunobod tumani, Yangihayot ko\'chasi 56, "Sayxunobod" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/sayxunobod_savdo_tsentr/108225791116'
-                    },
-                    {
-                        'name': 'XOVOS - (Xovos tumani)',
-                        'address': 'Xovos tumani, Tinchlik ko\'chasi 18, "Xovos" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/xovos_bazari/108225791117'
-                    },
-                    {
-                        'name': 'MEHNATOBOD - (Mehnatobod tumani)',
-                        'address': 'Mehnatobod tumani, Navbahor ko\'chasi 29, "Mehnatobod" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/mehnatobod_savdo_tsentr/108225791118'
-                    },
-                    {
-                        'name': 'GULISTON - (Guliston tumani)',
-                        'address': 'Guliston tumani, Markaziy ko\'chasi 41, "Guliston" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/guliston_bazari/108225791119'
-                    },
-                    {
-                        'name': 'OQOLTIN - (Oqoltin tumani)',
-                        'address': 'Oqoltin tumani, Yangiobod ko\'chasi 15, "Oqoltin" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/oqoltin_savdo_tsentr/108225791120'
-                    },
-                    {
-                        'name': 'BOYOVUT - (Boyovut tumani)',
-                        'address': 'Boyovut tumani, Bogishamol ko\'chasi 22, "Boyovut" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/boyovut_bazari/108225791121'
-                    }
-                ]
-            },
-             'karakalpakstan': {
-                'ru': [
-                    {
-                        'name': 'NUKUS - (г.Нукус)',
-                        'address': 'ул. Татибаева дом-б/н. 22 Ресторан "Neo"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 08:00-20:00, Сб: 08:00-18:00, Вс: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/neo/1126547855'
-                    },
-                    {
-                        'name': 'NUKUS 26-MKR - (г.Нукус)',
-                        'address': 'Город Нукус, улица Пиржан Сейтов 1А-дом,44-кв Рядом Туз кафе',
-                        'phone': '1230', 
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/tuz_kafe/1283746521'
-                    },
-                    {
-                        'name': 'TAXIATOSH - (Тахиаташский р-н)',
-                        'address': 'Тахиаташский район, улица Камолот, дом 35-А Рынок Тахиатош',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 09:00-18:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/taxiatosh_bazari/1456789234'
-                    },
-                    {
-                        'name': 'AMUDARYO - (Амударьинский р-н)',
-                        'address': 'Амударинский р-н, ул. Тадбиркорлар, 11 Мечет Эшонбобо',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 09:00-18:00, Вс: Выходные дни', 
-                        'yandex_map': 'https://yandex.uz/maps/org/eshonbobo_masjidi/1678902345'
-                    },
-                    {
-                        'name': 'BERUNIY - (Берунийский р-н)',
-                        'address': '35-maktab ro\'parasi Старый Индустриальный Колледж',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 09:00-18:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/sanoat_kolleji/1789012456'
-                    },
-                    {
-                        'name': 'KEGEYLI - (Кегейлийский р-н)',
-                        'address': 'Кегейлийский район, ул. Амира Темура 45, Рынок "Kegeli"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/kegeyli_bazari/1890123567'
-                    },
-                    {
-                        'name': 'KUNGIROT - (Кунградский р-н)',
-                        'address': 'Кунградский район, ул. Центральная 12, ТЦ "Kungrad"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-18:00, Сб: 09:00-16:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/kungrad_savdo_markazi/1901234678'
-                    },
-                    {
-                        'name': 'MUYNAK - (Муйнакский р-н)',
-                        'address': 'Муйнакский район, ул. Аральская 8, Рынок "Muynak"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/muynoq_bazari/2012345789'
-                    },
-                    {
-                        'name': 'NUKUS 15-MKR - (г.Нукус)',
-                        'address': 'Город Нукус, 15-микрорайон, ул. Каракалпакская 25, Магазин "Dostlik"',
-                        'phone': '1230',
-                        'hours': 'Пн-Пт: 09:00-19:00, Сб: 09:00-17:00, Вс: 09:00-15:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/dostlik_magazini/2123456890'
-                    },
-                    {
-                        'name': 'CHIMBOY - (Чимбайский р-н)',
-                        'address': 'Чимбайский район, ул. Шаббаз 18, Рынок "Chimboy"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-18:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/chimboy_bazari/2234567901'
-                    },
-                    {
-                        'name': 'SHUMANAY - (Шуманайский р-н)',
-                        'address': 'Шуманайский район, ул. Марказий 33, Магазин "Shumanay"',
-                        'phone': '1230',
-                        'hours': 'Пн-Сб: 08:00-17:00, Вс: Выходные дни',
-                        'yandex_map': 'https://yandex.uz/maps/org/shumanay_magazini/2345678012'
-                    }
-                ],
-                'uz': [
-                    {
-                        'name': 'NUKUS - (Nukus sh.)',
-                        'address': 'Tatieva ko\'chasi, 22 "Neo" restorani',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 08:00-20:00, Sh: 08:00-18:00, Ya: 08:00-16:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/neo/1126547855'
-                    },
-                    {
-                        'name': 'NUKUS 26-MKR - (Nukus sh.)', 
-                        'address': 'Nukus sh., Pirjon Seytov 1A-uy, 44-x Tuz kafe yoni',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/tuz_kafe/1283746521'
-                    },
-                    {
-                        'name': 'TAXIATOSH - (Taxiatosh tumani)',
-                        'address': 'Taxiatosh tumani, Kamolot ko\'chasi 35-A Taxiatosh bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 09:00-18:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/taxiatosh_bazari/1456789234'
-                    },
-                    {
-                        'name': 'AMUDARYO - (Amudaryo tumani)',
-                        'address': 'Amudaryo tumani, Tadbirkorlar ko\'chasi 11 Eshonbobo masjidi',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 09:00-18:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/eshonbobo_masjidi/1678902345'
-                    },
-                    {
-                        'name': 'BERUNIY - (Beruniy tumani)',
-                        'address': '35-maktab ro\'parasi Eski Sanoat Kolleji',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 09:00-18:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/sanoat_kolleji/1789012456'
-                    },
-                    {
-                        'name': 'KEGEYLI - (Kegeyli tumani)',
-                        'address': 'Kegeyli tumani, Amir Temur ko\'chasi 45 "Kegeyli" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kegeyli_bazari/1890123567'
-                    },
-                    {
-                        'name': 'KUNGIROT - (Kungirot tumani)',
-                        'address': 'Kungirot tumani, Markaziy ko\'chasi 12 "Kungrad" savdo markazi',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-18:00, Sh: 09:00-16:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/kungrad_savdo_markazi/1901234678'
-                    },
-                    {
-                        'name': 'MUYNAK - (Muynoq tumani)',
-                        'address': 'Muynoq tumani, Orol ko\'chasi 8 "Muynoq" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/muynoq_bazari/2012345789'
-                    },
-                    {
-                        'name': 'NUKUS 15-MKR - (Nukus sh.)',
-                        'address': 'Nukus sh., 15-mikrorayon, Qoraqalpoq ko\'chasi 25 "Do\'stlik" do\'koni',
-                        'phone': '1230',
-                        'hours': 'Du-Ju: 09:00-19:00, Sh: 09:00-17:00, Ya: 09:00-15:00',
-                        'yandex_map': 'https://yandex.uz/maps/org/dostlik_magazini/2123456890'
-                    },
-                    {
-                        'name': 'CHIMBOY - (Chimboy tumani)',
-                        'address': 'Chimboy tumani, Shabbaz ko\'chasi 18 "Chimboy" bozori',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-18:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/chimboy_bazari/2234567901'
-                    },
-                    {
-                        'name': 'SHUMANAY - (Shumanay tumani)',
-                        'address': 'Shumanay tumani, Markaziy ko\'chasi 33 "Shumanay" do\'koni',
-                        'phone': '1230',
-                        'hours': 'Du-Sh: 08:00-17:00, Ya: Dam olish kuni',
-                        'yandex_map': 'https://yandex.uz/maps/org/shumanay_magazini/2345678012'
-                    }
-                ]
-            }
-        }
+# Справочник регионов и почтовых отделений лежит вне кода: data/geo/<версия>/regions.json и
+# data/geo/<версия>/post_offices/<регион>.json, актуальная версия записана в data/geo/CURRENT.
+# Отделения региона читаются с диска при первом обращении к нему. Новая версия, загруженная админом,
+# пишется в отдельный каталог, после чего указатель и состояние в памяти подменяются атомарно
+GEO_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'geo')
+
+def office_button_text(office):
+    return office['name'] if isinstance(office, dict) else office
+
+class GeoSnapshot:
+    def __init__(self, version, path):
+        self.version = version
+        self.path = path
+        with open(os.path.join(path, 'regions.json'), encoding='utf-8') as f:
+            self.regions = json.load(f)
+        # Обратный индекс "текст кнопки -> ключ региона" для обоих языков
+        self.region_by_text = {text: key for regions in self.regions.values() for key, text in regions.items()}
+        self._offices = {}
+
+    def offices(self, region_key):
+        # (отделения по языкам, обратный индекс "текст кнопки -> запись отделения")
+        offices = self._offices.get(region_key)
+        if offices is None:
+            if not region_key.isidentifier():
+                return {}, {}
+            try:
+                with open(os.path.join(self.path, 'post_offices', f'{region_key}.json'), encoding='utf-8') as f:
+                    by_lang = json.load(f)
+            except FileNotFoundError:
+                by_lang = {}
+            index = {office_button_text(office): office for items in by_lang.values() for office in items}
+            offices = self._offices[region_key] = (by_lang, index)
+        return offices
+
+class GeoStore:
+    def __init__(self, root):
+        self.root = root
+        self._snapshot = None
+
+    @property
+    def snapshot(self):
+        if self._snapshot is None:
+            with open(os.path.join(self.root, 'CURRENT'), encoding='utf-8') as f:
+                version = f.read().strip()
+            self._snapshot = GeoSnapshot(version, os.path.join(self.root, version))
+        return self._snapshot
+
+    def regions(self, lang):
+        return self.snapshot.regions.get(lang, {})
+
+    def region_by_text(self, text):
+        return self.snapshot.region_by_text.get(text)
+
+    def post_offices(self, region_key, lang):
+        return self.snapshot.offices(region_key)[0].get(lang, [])
+
+    def find_office(self, region_key, text):
+        return self.snapshot.offices(region_key)[1].get(text)
+
+    @staticmethod
+    def validate(dataset):
+        regions = dataset.get('regions') if isinstance(dataset, dict) else None
+        post_offices = dataset.get('post_offices') if isinstance(dataset, dict) else None
+        if not isinstance(regions, dict) or not isinstance(post_offices, dict):
+            raise ValueError("ожидаются разделы 'regions' и 'post_offices'")
+        for lang in LANGUAGES:
+            if not isinstance(regions.get(lang), dict) or not regions[lang]:
+                raise ValueError(f"нет списка регионов для языка '{lang}'")
+        for region_key, by_lang in post_offices.items():
+            if not region_key.isidentifier() or region_key not in regions[LANGUAGES[0]]:
+                raise ValueError(f"неизвестный регион '{region_key}'")
+            if not isinstance(by_lang, dict):
+                raise ValueError(f"{region_key}: ожидаются отделения по языкам")
+            for lang, offices in by_lang.items():
+                if lang not in LANGUAGES or not isinstance(offices, list):
+                    raise ValueError(f"{region_key}: неверный список отделений для '{lang}'")
+                for office in offices:
+                    if not isinstance(office, str) and not (isinstance(office, dict) and office.get('name')):
+                        raise ValueError(f"{region_key}: у отделения нет названия")
+
+    def publish(self, dataset):
+        # Блокирующий ввод-вывод: вызывать через asyncio.to_thread
+        self.validate(dataset)
+        previous = self.snapshot.version
+        path = tempfile.mkdtemp(prefix=time.strftime('v%Y%m%d%H%M%S_'), dir=self.root)
+        version = os.path.basename(path)
+        os.makedirs(os.path.join(path, 'post_offices'))
+        with open(os.path.join(path, 'regions.json'), 'w', encoding='utf-8') as f:
+            json.dump(dataset['regions'], f, ensure_ascii=False, separators=(',', ':'))
+        for region_key, by_lang in dataset['post_offices'].items():
+            with open(os.path.join(path, 'post_offices', f'{region_key}.json'), 'w', encoding='utf-8') as f:
+                json.dump(by_lang, f, ensure_ascii=False, separators=(',', ':'))
+
+        pointer = os.path.join(self.root, 'CURRENT.tmp')
+        with open(pointer, 'w', encoding='utf-8') as f:
+            f.write(version + '\n')
+        os.replace(pointer, os.path.join(self.root, 'CURRENT'))
+        self._snapshot = GeoSnapshot(version, path)
+
+        # Оставляем только новую и предыдущую версии
+        for name in os.listdir(self.root):
+            if name not in (version, previous, 'base', 'CURRENT') and os.path.isdir(os.path.join(self.root, name)):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return self._snapshot
+
+geo_store = GeoStore(GEO_DATA_DIR)
 
 ORDER_STATUSES = {
     'pending': {'ru': '⏳ Ожидает оплаты', 'uz': '⏳ To\'lov kutilmoqda'},
@@ -1909,119 +372,471 @@ class OrderFlow(StatesGroup):
     admin_statistics = State()
     admin_viewing_reviews = State()
     admin_managing_reviews = State()
+    admin_uploading_geo = State()
+    admin_broadcast_audience = State()
+    admin_broadcast_region = State()
+    admin_broadcast_text = State()
+    admin_broadcast_confirm = State()
+    admin_stats_custom_range = State()
 
 # ================== РАБОТА С БД ==================
+# Каждый поток пула держит одно долгоживущее соединение: нет connect на каждый вызов,
+# нет утечки дескрипторов, а кэш подготовленных выражений (cached_statements) остаётся прогретым.
+# Чтение идёт через пул read-only соединений, запись - через единственное соединение-писатель:
+# в режиме WAL читатели не блокируют запись и наоборот
+_db_local = threading.local()
+_db_connections = []
+_db_connections_lock = threading.Lock()
+
+def _init_reader_thread():
+    _db_local.readonly = True
+
+def _init_writer_thread():
+    _db_local.readonly = False
+
+db_read_executor = ThreadPoolExecutor(max_workers=DB_READ_POOL_SIZE, thread_name_prefix="db-read",
+                                      initializer=_init_reader_thread)
+db_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write",
+                                       initializer=_init_writer_thread)
+
+def _apply_pragmas(conn, readonly):
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    if readonly:
+        conn.execute("PRAGMA query_only = 1")
+    else:
+        conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+        # Групповой коммит делает fsync на пачку, поэтому по умолчанию можно позволить себе FULL
+        conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_FILENAME, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        readonly = getattr(_db_local, 'readonly', False)
+        if readonly:
+            conn = sqlite3.connect(f"file:{DB_FILENAME}?mode=ro", uri=True, check_same_thread=False,
+                                   cached_statements=DB_STATEMENT_CACHE_SIZE)
+        else:
+            # Транзакциями писателя управляет _commit_batch вручную
+            conn = sqlite3.connect(DB_FILENAME, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE,
+                                   isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        _apply_pragmas(conn, readonly)
+        _db_local.conn = conn
+        with _db_connections_lock:
+            _db_connections.append(conn)
     return conn
 
-def setup_database():
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY, phone TEXT, name TEXT, 
-            language TEXT DEFAULT 'ru', region TEXT, post_office TEXT, 
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, 
-            name_ru TEXT, name_uz TEXT, price INTEGER,
-            category_ru TEXT, category_uz TEXT, image_url TEXT, 
-            description_ru TEXT, description_uz TEXT, sizes TEXT,
-            is_active INTEGER DEFAULT 1)''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS cart_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER DEFAULT 1,
-            size TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (product_id) REFERENCES products(id))''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, 
-            user_id INTEGER,
-            items TEXT,  -- JSON список товаров
-            total_price INTEGER,
-            status TEXT DEFAULT 'pending',
-            receipt_photo_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS reviews (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            user_name TEXT,
-            product_id INTEGER,
-            rating INTEGER CHECK(rating >= 1 AND rating <= 5),
-            review_text TEXT,
-            is_approved INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(user_id),
-            FOREIGN KEY (product_id) REFERENCES products(id)
-        )''')
-        conn.commit()
-
-def save_user(user_id, phone, name, language, region=None, post_office=None):
-    with get_db_connection() as conn:
-        conn.execute("""INSERT OR REPLACE INTO users (user_id, phone, name, language, region, post_office) 
-                        VALUES (?, ?, ?, ?, ?, ?)""", (user_id, phone, name, language, region, post_office))
-        conn.commit()
+def db_read(func):
+    # Синхронная функция DAL -> awaitable: запрос уходит в пул читателей и не блокирует event loop
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(db_read_executor, partial(func, *args, **kwargs))
+    wrapper.sync = func
+    return wrapper
+
+# Групповой коммит: мутации из хендлеров попадают в очередь единственного писателя,
+# всё, что пришло в пределах окна DB_GROUP_COMMIT_WINDOW_MS, пишется одной транзакцией
+# (каждая мутация - в своём SAVEPOINT), а future вызывающего резолвится только после COMMIT
+_write_queue = asyncio.Queue()
+
+def db_write(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        future = asyncio.get_running_loop().create_future()
+        await _write_queue.put((partial(func, *args, **kwargs), future))
+        return await future
+    wrapper.sync = func
+    return wrapper
+
+def _commit_batch(batch):
+    conn = get_db_connection()
+    results = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for call, _ in batch:
+            conn.execute("SAVEPOINT mutation")
+            try:
+                results.append((True, call()))
+                conn.execute("RELEASE mutation")
+            except Exception as e:
+                # Ошибка одной мутации не должна откатывать остальные мутации пачки
+                conn.execute("ROLLBACK TO mutation")
+                conn.execute("RELEASE mutation")
+                results.append((False, e))
+        conn.execute("COMMIT")
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        return [(False, e)] * len(batch)
+    return results
+
+async def db_writer_loop():
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await _write_queue.get()
+        if item is None:
+            break
+        batch = [item]
+        deadline = loop.time() + DB_GROUP_COMMIT_WINDOW_MS / 1000
+        while len(batch) < DB_GROUP_COMMIT_MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_write_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        results = await loop.run_in_executor(db_write_executor, _commit_batch, batch)
+        for (_, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+async def stop_db_writer(writer_task):
+    # Сентинел встаёт в очередь после всех уже принятых мутаций - они будут закоммичены
+    await _write_queue.put(None)
+    await writer_task
+
+def warm_up_db_pool():
+    # Открываем соединения во всех потоках пула заранее, чтобы первые запросы не платили за connect
+    barrier = threading.Barrier(DB_READ_POOL_SIZE)
+
+    def _open():
+        get_db_connection()
+        barrier.wait()
+
+    for future in [db_read_executor.submit(_open) for _ in range(DB_READ_POOL_SIZE)]:
+        future.result()
+
+def close_db_pool():
+    db_read_executor.shutdown(wait=True)
+    db_write_executor.shutdown(wait=True)
+    with _db_connections_lock:
+        for conn in _db_connections:
+            conn.close()
+        _db_connections.clear()
+
+# Миграции схемы: применяются по порядку ровно один раз, номер последней хранится в PRAGMA user_version.
+# Новые изменения схемы добавляются только в конец MIGRATIONS
+def _migration_initial_schema(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY, phone TEXT, name TEXT, 
+        language TEXT DEFAULT 'ru', region TEXT, post_office TEXT, 
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    conn.execute('''CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, 
+        name_ru TEXT, name_uz TEXT, price INTEGER,
+        category_ru TEXT, category_uz TEXT, image_url TEXT, 
+        description_ru TEXT, description_uz TEXT, sizes TEXT,
+        is_active INTEGER DEFAULT 1)''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS cart_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        product_id INTEGER,
+        quantity INTEGER DEFAULT 1,
+        size TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES products(id))''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, 
+        user_id INTEGER,
+        items TEXT,  -- JSON список товаров
+        total_price INTEGER,
+        status TEXT DEFAULT 'pending',
+        receipt_photo_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    conn.execute('''CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        user_name TEXT,
+        product_id INTEGER,
+        rating INTEGER CHECK(rating >= 1 AND rating <= 5),
+        review_text TEXT,
+        is_approved INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id),
+        FOREIGN KEY (product_id) REFERENCES products(id)
+    )''')
+
+def _migration_hot_query_indexes(conn):
+    # Перед уникальным ключом схлопываем дубли корзины в одну строку с суммарным количеством
+    conn.execute("""UPDATE cart_items SET quantity = (
+                        SELECT SUM(c2.quantity) FROM cart_items c2
+                        WHERE c2.user_id = cart_items.user_id AND c2.product_id = cart_items.product_id
+                          AND IFNULL(c2.size, '') = IFNULL(cart_items.size, ''))
+                    WHERE id IN (SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id, IFNULL(size, ''))""")
+    conn.execute("""DELETE FROM cart_items
+                    WHERE id NOT IN (SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id, IFNULL(size, ''))""")
+    # NULL в уникальном индексе не сравниваются, поэтому размер без значения приводим к ''
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_cart_items_user_product_size
+                    ON cart_items(user_id, product_id, IFNULL(size, ''))""")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_user_created ON orders(user_id, created_at)")
+    conn.execute("""CREATE INDEX IF NOT EXISTS ix_reviews_product_approved
+                    ON reviews(product_id, created_at) WHERE is_approved = 1""")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_reviews_pending ON reviews(created_at) WHERE is_approved = 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_reviews_user_created ON reviews(user_id, created_at)")
+    conn.execute("""CREATE INDEX IF NOT EXISTS ix_products_active_category_ru
+                    ON products(category_ru, id) WHERE is_active = 1""")
+    conn.execute("""CREATE INDEX IF NOT EXISTS ix_products_active_category_uz
+                    ON products(category_uz, id) WHERE is_active = 1""")
+
+def _parse_legacy_order_items(order_id, items_json):
+    # Заказ разбирается целиком до вставки: при любой ошибке он пропускается полностью, а не наполовину
+    try:
+        items = json.loads(items_json)
+        if not isinstance(items, list):
+            raise ValueError("ожидался список позиций")
+        return [(order_id, int(item['product_id']), item.get('size'),
+                 int(item.get('quantity', 1)), int(item.get('price', 0)))
+                for item in items]
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        logger.warning(f"Заказ #{order_id}: не удалось разобрать items, заказ пропущен ({e})")
+        return []
+
+def _migration_order_items(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS order_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        size TEXT,
+        quantity INTEGER NOT NULL DEFAULT 1,
+        unit_price INTEGER NOT NULL,
+        FOREIGN KEY (order_id) REFERENCES orders(id),
+        FOREIGN KEY (product_id) REFERENCES products(id))''')
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_order_items_order ON order_items(order_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_order_items_product ON order_items(product_id, order_id)")
+
+    # Переносим старые JSON-строки orders.items пачками, чтобы не держать всю таблицу в памяти
+    last_id = 0
+    while True:
+        rows = conn.execute("""SELECT id, items FROM orders WHERE id > ? AND items IS NOT NULL
+                               ORDER BY id LIMIT ?""", (last_id, ORDER_ITEMS_BACKFILL_BATCH)).fetchall()
+        if not rows:
+            break
+        batch = []
+        for order_id, items_json in rows:
+            batch.extend(_parse_legacy_order_items(order_id, items_json))
+        conn.executemany("""INSERT INTO order_items (order_id, product_id, size, quantity, unit_price)
+                            VALUES (?, ?, ?, ?, ?)""", batch)
+        last_id = rows[-1][0]
+
+def _migration_product_ratings(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS product_ratings (
+        product_id INTEGER PRIMARY KEY,
+        rating_sum INTEGER NOT NULL DEFAULT 0,
+        rating_count INTEGER NOT NULL DEFAULT 0,
+        stars_1 INTEGER NOT NULL DEFAULT 0,
+        stars_2 INTEGER NOT NULL DEFAULT 0,
+        stars_3 INTEGER NOT NULL DEFAULT 0,
+        stars_4 INTEGER NOT NULL DEFAULT 0,
+        stars_5 INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (product_id) REFERENCES products(id))''')
+    _rebuild_rating_summaries(conn)
+
+def _migration_user_catalog_view(conn):
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(users)")}
+    if 'catalog_view' not in columns:
+        conn.execute("ALTER TABLE users ADD COLUMN catalog_view TEXT")  # NULL - режим по умолчанию
+
+def _migration_broadcasts(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS broadcasts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        admin_id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        language TEXT,
+        region TEXT,
+        status TEXT NOT NULL DEFAULT 'running',
+        last_user_id INTEGER NOT NULL DEFAULT 0,
+        delivered INTEGER NOT NULL DEFAULT 0,
+        blocked INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP)''')
+    # Получатели выбираются порциями по возрастанию user_id внутри фильтра
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_users_language ON users(language, user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_users_region ON users(region, user_id)")
+
+def _migration_fsm_storage(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS fsm_storage (
+        key TEXT PRIMARY KEY,
+        state TEXT,
+        data TEXT NOT NULL DEFAULT '{}',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP) WITHOUT ROWID''')
+
+def _migration_admin_order_indexes(conn):
+    # Лента заказов в админке: все заказы и с фильтром по статусу, от новых к старым
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_created ON orders(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_status_created ON orders(status, created_at)")
+
+def _migration_purchases(conn):
+    # Купленные (доставленные) товары пользователя - проверка права на отзыв одним поиском по ключу
+    conn.execute('''CREATE TABLE IF NOT EXISTS purchases (
+        user_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        first_order_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, product_id)) WITHOUT ROWID''')
+    conn.execute("""INSERT OR IGNORE INTO purchases (user_id, product_id, first_order_id)
+                    SELECT o.user_id, oi.product_id, MIN(o.id) 
+                    FROM orders o 
+                    JOIN order_items oi ON oi.order_id = o.id 
+                    WHERE o.status = 'delivered' 
+                    GROUP BY o.user_id, oi.product_id""")
+
+def _migration_stats_range_index(conn):
+    # Статистика считается по полуинтервалу created_at; total_price в индексе делает его покрывающим.
+    # Ленте заказов в админке этот индекс подходит так же, как ix_orders_created
+    conn.execute("DROP INDEX IF EXISTS ix_orders_created")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_created_status ON orders(created_at, status, total_price)")
+
+def _migration_daily_sales(conn):
+    # Дневная сводка по дате создания заказа (UTC): число заказов, выручка по доставленным
+    # и количество заказов в каждом статусе. Меняется в тех же транзакциях, что и сами заказы.
+    # Колонки зафиксированы: новый статус заказа добавляется отдельной миграцией (ALTER TABLE)
+    conn.execute('''CREATE TABLE IF NOT EXISTS daily_sales (
+        day TEXT PRIMARY KEY,
+        orders INTEGER NOT NULL DEFAULT 0,
+        revenue INTEGER NOT NULL DEFAULT 0,
+        pending INTEGER NOT NULL DEFAULT 0,
+        waiting_confirm INTEGER NOT NULL DEFAULT 0,
+        confirmed INTEGER NOT NULL DEFAULT 0,
+        shipping INTEGER NOT NULL DEFAULT 0,
+        delivered INTEGER NOT NULL DEFAULT 0,
+        cancelled INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID''')
+    _rebuild_daily_sales(conn, ('pending', 'waiting_confirm', 'confirmed', 'shipping', 'delivered', 'cancelled'))
+
+MIGRATIONS = [
+    _migration_initial_schema,
+    _migration_hot_query_indexes,
+    _migration_order_items,
+    _migration_product_ratings,
+    _migration_user_catalog_view,
+    _migration_broadcasts,
+    _migration_fsm_storage,
+    _migration_admin_order_indexes,
+    _migration_purchases,
+    _migration_stats_range_index,
+    _migration_daily_sales,
+]
 
+def setup_database():
+    conn = get_db_connection()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS, 1):
+        if number <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Миграция БД #{number} ({migration.__name__}) применена")
+    conn.execute("PRAGMA optimize")
+
+@db_write
+def _save_user(user_id, phone, name, language, region=None, post_office=None):
+    conn = get_db_connection()
+    conn.execute("""INSERT OR REPLACE INTO users (user_id, phone, name, language, region, post_office) 
+                    VALUES (?, ?, ?, ?, ?, ?)""", (user_id, phone, name, language, region, post_office))
+
+async def save_user(user_id, phone, name, language, region=None, post_office=None):
+    await _save_user(user_id, phone, name, language, region, post_office)
+    user_cache.invalidate(user_id)
+
+@db_write
+def _set_catalog_view(user_id, view):
+    conn = get_db_connection()
+    conn.execute("UPDATE users SET catalog_view = ? WHERE user_id = ?", (view, user_id))
+
+async def set_catalog_view(user_id, view):
+    await _set_catalog_view(user_id, view)
+    user_cache.invalidate(user_id)
+
+@db_read
 def get_user(user_id):
     with get_db_connection() as conn:
         cursor = conn.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
         return cursor.fetchone()
 
-def add_product(name, price, category_ru, category_uz, image_url):
-    with get_db_connection() as conn:
-        conn.execute("""INSERT INTO products (name_ru, name_uz, price, category_ru, category_uz, image_url, description_ru, description_uz, sizes) 
-                        VALUES (?, ?, ?, ?, ?, ?, 'Описание товара', 'Mahsulot tavsifi', 'S, M, L, XL')""", 
-                        (name, name, price, category_ru, category_uz, image_url))
-        conn.commit()
-
-def update_product(product_id, field, value):
-    with get_db_connection() as conn:
-        conn.execute(f"UPDATE products SET {field} = ? WHERE id = ?", (value, product_id))
-        conn.commit()
-
-def delete_product(product_id):
-    with get_db_connection() as conn:
-        conn.execute("UPDATE products SET is_active = 0 WHERE id = ?", (product_id,))
-        conn.commit()
-
-def get_all_products():
-    with get_db_connection() as conn:
-        cursor = conn.execute("SELECT * FROM products WHERE is_active = 1 ORDER BY id DESC")
-        return cursor.fetchall()
-
+@db_write
+def _add_product(name, price, category_ru, category_uz, image_url):
+    conn = get_db_connection()
+    conn.execute("""INSERT INTO products (name_ru, name_uz, price, category_ru, category_uz, image_url, description_ru, description_uz, sizes) 
+                    VALUES (?, ?, ?, ?, ?, ?, 'Описание товара', 'Mahsulot tavsifi', 'S, M, L, XL')""", 
+                    (name, name, price, category_ru, category_uz, image_url))
+
+@db_write
+def _update_product(product_id, field, value):
+    conn = get_db_connection()
+    conn.execute(f"UPDATE products SET {field} = ? WHERE id = ?", (value, product_id))
+
+@db_write
+def _delete_product(product_id):
+    conn = get_db_connection()
+    conn.execute("UPDATE products SET is_active = 0 WHERE id = ?", (product_id,))
+
+# Изменения каталога сквозные: после коммита кэш каталога пересобирается
+async def add_product(name, price, category_ru, category_uz, image_url):
+    await _add_product(name, price, category_ru, category_uz, image_url)
+    await catalog_cache.rebuild()
+
+async def update_product(product_id, field, value):
+    await _update_product(product_id, field, value)
+    await catalog_cache.rebuild()
+
+async def delete_product(product_id):
+    await _delete_product(product_id)
+    await catalog_cache.rebuild()
+
+@db_read
 def get_product_by_id(pid):
     with get_db_connection() as conn:
         return conn.execute("SELECT * FROM products WHERE id = ?", (pid,)).fetchone()
 
-def get_products_by_category(category, lang):
-    col = 'category_ru' if lang == 'ru' else 'category_uz'
+@db_read
+def get_catalog_rows():
     with get_db_connection() as conn:
-        cursor = conn.execute(f"SELECT * FROM products WHERE {col} = ? AND is_active = 1", (category,))
+        cursor = conn.execute("""SELECT p.*, 
+                                        IFNULL(r.rating_sum, 0) as rating_sum, 
+                                        IFNULL(r.rating_count, 0) as rating_count 
+                                 FROM products p 
+                                 LEFT JOIN product_ratings r ON r.product_id = p.id 
+                                 WHERE p.is_active = 1 
+                                 ORDER BY p.id""")
         return cursor.fetchall()
 
+@db_write
 def add_to_cart(user_id, product_id, quantity=1, size=None):
-    with get_db_connection() as conn:
-        existing = conn.execute("SELECT * FROM cart_items WHERE user_id = ? AND product_id = ?", 
-                                (user_id, product_id)).fetchone()
-        if existing:
-            conn.execute("UPDATE cart_items SET quantity = quantity + ? WHERE id = ?", (quantity, existing['id']))
-        else:
-            conn.execute("""INSERT INTO cart_items (user_id, product_id, quantity, size) 
-                            VALUES (?, ?, ?, ?)""", (user_id, product_id, quantity, size))
-        conn.commit()
+    conn = get_db_connection()
+    conn.execute("""INSERT INTO cart_items (user_id, product_id, quantity, size) 
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(user_id, product_id, IFNULL(size, ''))
+                    DO UPDATE SET quantity = quantity + excluded.quantity""", (user_id, product_id, quantity, size))
 
+@db_write
 def remove_from_cart(user_id, product_id):
-    with get_db_connection() as conn:
-        conn.execute("DELETE FROM cart_items WHERE user_id = ? AND product_id = ?", (user_id, product_id))
-        conn.commit()
+    conn = get_db_connection()
+    conn.execute("DELETE FROM cart_items WHERE user_id = ? AND product_id = ?", (user_id, product_id))
 
+@db_read
 def get_cart_items(user_id):
     with get_db_connection() as conn:
         cursor = conn.execute("""SELECT ci.*, p.name_ru, p.name_uz, p.price, p.image_url 
@@ -2030,87 +845,321 @@ def get_cart_items(user_id):
                                  WHERE ci.user_id = ?""", (user_id,))
         return cursor.fetchall()
 
+@db_write
 def clear_cart(user_id):
+    conn = get_db_connection()
+    conn.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,))
+
+# Статусы, под которые в daily_sales есть колонки; расширяется вместе с миграцией, добавляющей колонку
+DAILY_SALES_STATUSES = ('pending', 'waiting_confirm', 'confirmed', 'shipping', 'delivered', 'cancelled')
+
+def _apply_daily_sales(conn, day, status, total_price, delta, new_order=False):
+    if status not in DAILY_SALES_STATUSES:
+        raise ValueError(f"Неизвестный статус заказа: {status}")
+    revenue = delta * total_price if status == 'delivered' else 0
+    conn.execute(f"""INSERT INTO daily_sales (day, orders, revenue, {status}) 
+                     VALUES (?, ?, ?, ?) 
+                     ON CONFLICT(day) DO UPDATE SET 
+                        orders = orders + excluded.orders, 
+                        revenue = revenue + excluded.revenue, 
+                        {status} = {status} + excluded.{status}""", 
+                 (day, delta if new_order else 0, revenue, delta))
+
+def _rebuild_daily_sales(conn, statuses=DAILY_SALES_STATUSES):
+    status_sums = ", ".join(f"SUM(status = '{status}')" for status in statuses)
+    conn.execute("DELETE FROM daily_sales")
+    conn.execute(f"""INSERT INTO daily_sales (day, orders, revenue, {', '.join(statuses)}) 
+                     SELECT date(created_at), COUNT(*), 
+                            COALESCE(SUM(CASE WHEN status = 'delivered' THEN total_price END), 0), 
+                            {status_sums} 
+                     FROM orders 
+                     GROUP BY date(created_at)""")
+
+@db_write
+def _rebuild_daily_sales_tx():
+    _rebuild_daily_sales(get_db_connection())
+
+async def rebuild_daily_sales():
+    await _rebuild_daily_sales_tx()
+
+def _insert_order(conn, user_id, lines, total_price, status, receipt_photo_id=None):
+    # lines: (product_id, size, quantity, unit_price); позиции пишутся в той же транзакции, что и сам заказ
+    cursor = conn.execute("""INSERT INTO orders (user_id, total_price, status, receipt_photo_id) 
+                             VALUES (?, ?, ?, ?) RETURNING id, date(created_at)""", 
+                             (user_id, total_price, status, receipt_photo_id))
+    order_id, day = cursor.fetchone()
+    conn.executemany("""INSERT INTO order_items (order_id, product_id, size, quantity, unit_price)
+                        VALUES (?, ?, ?, ?, ?)""",
+                     [(order_id, *line) for line in lines])
+    _apply_daily_sales(conn, day, status, total_price, 1, new_order=True)
+    return order_id
+
+@db_write
+def checkout(user_id, receipt_photo_id, status='waiting_confirm'):
+    # Оформление целиком в одной транзакции: живая корзина -> заказ с позициями и чеком -> очистка корзины.
+    # Возвращает (order_id, total, items) или None, если корзина пуста
+    conn = get_db_connection()
+    items = conn.execute("""SELECT ci.product_id, ci.size, ci.quantity, p.price, p.name_ru, p.name_uz 
+                            FROM cart_items ci 
+                            JOIN products p ON ci.product_id = p.id 
+                            WHERE ci.user_id = ? 
+                            ORDER BY ci.id""", (user_id,)).fetchall()
+    if not items:
+        return None
+    
+    total = sum(item['price'] * item['quantity'] for item in items)
+    lines = [(item['product_id'], item['size'], item['quantity'], item['price']) for item in items]
+    order_id = _insert_order(conn, user_id, lines, total, status, receipt_photo_id)
+    conn.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,))
+    return order_id, total, items
+
+def _set_order_status(conn, order_id, status):
+    # Смена статуса вместе с производными данными: дневной сводкой и индексом покупок
+    order = conn.execute("""SELECT user_id, status, total_price, date(created_at) AS day 
+                            FROM orders WHERE id = ?""", (order_id,)).fetchone()
+    if order is None:
+        return None
+    conn.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+    
+    if status != order['status']:
+        _apply_daily_sales(conn, order['day'], order['status'], order['total_price'], -1)
+        _apply_daily_sales(conn, order['day'], status, order['total_price'], 1)
+    
+    # Индекс покупок меняется только на переходах в delivered и из него
+    if status == 'delivered' and order['status'] != 'delivered':
+        conn.execute("""INSERT OR IGNORE INTO purchases (user_id, product_id, first_order_id)
+                        SELECT ?, product_id, ? FROM order_items WHERE order_id = ?""", 
+                     (order['user_id'], order_id, order_id))
+    elif order['status'] == 'delivered' and status != 'delivered':
+        # Товар остаётся купленным, если он есть в другом доставленном заказе
+        conn.execute("""DELETE FROM purchases 
+                        WHERE user_id = ? 
+                          AND product_id IN (SELECT product_id FROM order_items WHERE order_id = ?) 
+                          AND NOT EXISTS (SELECT 1 FROM order_items oi 
+                                          JOIN orders o ON o.id = oi.order_id 
+                                          WHERE o.user_id = purchases.user_id 
+                                            AND oi.product_id = purchases.product_id 
+                                            AND o.status = 'delivered')""", 
+                     (order['user_id'], order_id))
+    return order['user_id']
+
+@db_write
+def _update_order_status(order_id, status):
+    return _set_order_status(get_db_connection(), order_id, status)
+
+async def update_order_status(order_id, status):
+    user_id = await _update_order_status(order_id, status)
+    if user_id is not None:
+        purchase_cache.invalidate(user_id)
+
+@db_read
+def get_user_orders_page(user_id, anchor_id=None, direction='older', limit=ORDERS_PAGE_SIZE):
+    # Keyset-пагинация от новых к старым по (created_at, id) - индекс ix_orders_user_created
+    # хранит rowid, поэтому покрывает (user_id, created_at, id) без отдельного индекса.
+    # Возвращает (orders, has_newer, has_older)
     with get_db_connection() as conn:
-        conn.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,))
-        conn.commit()
-
-def create_order(user_id, items, total_price, status='pending'):
-    with get_db_connection() as conn:
-        cursor = conn.execute("""INSERT INTO orders (user_id, items, total_price, status) 
-                                 VALUES (?, ?, ?, ?) RETURNING id""", 
-                                 (user_id, json.dumps(items), total_price, status))
-        conn.commit()
-        return cursor.fetchone()[0]
-
-def update_order_status(order_id, status):
-    with get_db_connection() as conn:
-        conn.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
-        conn.commit()
-
-def update_order_receipt(order_id, photo_id):
+        if anchor_id is None:
+            rows = conn.execute("""SELECT * FROM orders WHERE user_id = ? 
+                                   ORDER BY created_at DESC, id DESC LIMIT ?""", (user_id, limit + 1)).fetchall()
+            return rows[:limit], False, len(rows) > limit
+        
+        anchor = "(SELECT created_at, id FROM orders WHERE id = ? AND user_id = ?)"
+        if direction == 'older':
+            rows = conn.execute(f"""SELECT * FROM orders WHERE user_id = ? AND (created_at, id) < {anchor} 
+                                    ORDER BY created_at DESC, id DESC LIMIT ?""", 
+                                (user_id, anchor_id, user_id, limit + 1)).fetchall()
+            return rows[:limit], True, len(rows) > limit
+        
+        rows = conn.execute(f"""SELECT * FROM orders WHERE user_id = ? AND (created_at, id) > {anchor} 
+                                ORDER BY created_at, id LIMIT ?""", 
+                            (user_id, anchor_id, user_id, limit + 1)).fetchall()
+        return rows[:limit][::-1], len(rows) > limit, True
+
+@db_read
+def get_orders_page(status=None, anchor_id=None, direction='older', limit=ADMIN_ORDERS_PAGE_SIZE):
+    # Страница заказов вместе с данными покупателя одним запросом; keyset по (created_at, id)
+    clauses, params = (["o.status = ?"], [status]) if status else ([], [])
+    sort = "DESC"
+    if anchor_id is not None:
+        op = "<" if direction == 'older' else ">"
+        clauses.append(f"(o.created_at, o.id) {op} (SELECT created_at, id FROM orders WHERE id = ?)")
+        params.append(anchor_id)
+        if direction == 'newer':
+            sort = "ASC"
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     with get_db_connection() as conn:
-        conn.execute("UPDATE orders SET receipt_photo_id = ?, status = 'waiting_confirm' WHERE id = ?", (photo_id, order_id))
-        conn.commit()
-
-def get_user_orders(user_id):
+        rows = conn.execute(f"""SELECT o.*, u.name AS user_name, u.phone AS user_phone 
+                                FROM orders o 
+                                LEFT JOIN users u ON u.user_id = o.user_id 
+                                {where} 
+                                ORDER BY o.created_at {sort}, o.id {sort} LIMIT ?""", 
+                            (*params, limit + 1)).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if anchor_id is None:
+        return rows, False, has_more
+    if direction == 'older':
+        return rows, True, has_more
+    return rows[::-1], has_more, True
+
+@db_read
+def get_order_by_id(order_id):
     with get_db_connection() as conn:
-        cursor = conn.execute("SELECT * FROM orders WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
-        return cursor.fetchall()
+        return conn.execute("SELECT * FROM orders WHERE id = ?", (order_id,)).fetchone()
 
-def get_all_orders():
+@db_read
+def get_order_items(order_id):
     with get_db_connection() as conn:
-        cursor = conn.execute("SELECT * FROM orders ORDER BY created_at DESC")
+        cursor = conn.execute("""SELECT oi.*, p.name_ru, p.name_uz 
+                                 FROM order_items oi 
+                                 JOIN products p ON oi.product_id = p.id 
+                                 WHERE oi.order_id = ? 
+                                 ORDER BY oi.id""", (order_id,))
         return cursor.fetchall()
 
-def get_order_by_id(order_id):
+@db_read
+def get_user_purchases(user_id):
     with get_db_connection() as conn:
-        return conn.execute("SELECT * FROM orders WHERE id = ?", (order_id,)).fetchone()
+        cursor = conn.execute("SELECT product_id FROM purchases WHERE user_id = ?", (user_id,))
+        return frozenset(row[0] for row in cursor)
+
+STATS_PERIODS = {
+    'day': "сегодня",
+    'week': "текущую неделю",
+    'month': "текущий месяц",
+    'year': "текущий год",
+}
 
-def get_monthly_statistics(year=None, month=None):
+def period_range(period, now=None):
+    # Полуинтервал [start, end) в UTC - в той же шкале, что и CURRENT_TIMESTAMP в created_at
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'day':
+        return today, today + timedelta(days=1)
+    if period == 'week':
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=7)
+    if period == 'month':
+        return month_range(today.year, today.month)
+    if period == 'year':
+        return datetime(today.year, 1, 1), datetime(today.year + 1, 1, 1)
+    raise ValueError(f"Неизвестный период: {period}")
+
+def month_range(year, month):
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def _db_timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+def _is_day_start(value):
+    return value == value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+@db_read
+def get_order_statistics(start, end):
     with get_db_connection() as conn:
-        if year and month:
-            cursor = conn.execute("""
-                SELECT 
-                    COUNT(*) as total_orders,
-                    SUM(CASE WHEN status = 'delivered' THEN total_price ELSE 0 END) as total_revenue,
-                    SUM(CASE WHEN status = 'delivered' THEN 1 ELSE 0 END) as delivered_orders,
-                    AVG(CASE WHEN status = 'delivered' THEN total_price ELSE NULL END) as avg_order_value
-                FROM orders 
-                WHERE strftime('%Y', created_at) = ? AND strftime('%m', created_at) = ?
-            """, (str(year), str(month).zfill(2)))
-        else:
+        if _is_day_start(start) and _is_day_start(end):
+            # Целые дни читаются из сводки daily_sales - одна строка на день вместо всех заказов
             cursor = conn.execute("""
                 SELECT 
-                    COUNT(*) as total_orders,
-                    SUM(CASE WHEN status = 'delivered' THEN total_price ELSE 0 END) as total_revenue,
-                    SUM(CASE WHEN status = 'delivered' THEN 1 ELSE 0 END) as delivered_orders,
-                    AVG(CASE WHEN status = 'delivered' THEN total_price ELSE NULL END) as avg_order_value
-                FROM orders 
-                WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')
-            """)
+                    COALESCE(SUM(orders), 0) as total_orders,
+                    COALESCE(SUM(revenue), 0) as total_revenue,
+                    COALESCE(SUM(delivered), 0) as delivered_orders,
+                    CAST(SUM(revenue) AS REAL) / NULLIF(SUM(delivered), 0) as avg_order_value
+                FROM daily_sales 
+                WHERE day >= ? AND day < ?
+            """, (start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+            return cursor.fetchone()
+        
+        # Условие по голому created_at использует индекс ix_orders_created_status, без вычислений на каждой строке
+        cursor = conn.execute("""
+            SELECT 
+                COUNT(*) as total_orders,
+                SUM(CASE WHEN status = 'delivered' THEN total_price ELSE 0 END) as total_revenue,
+                SUM(CASE WHEN status = 'delivered' THEN 1 ELSE 0 END) as delivered_orders,
+                AVG(CASE WHEN status = 'delivered' THEN total_price ELSE NULL END) as avg_order_value
+            FROM orders 
+            WHERE created_at >= ? AND created_at < ?
+        """, (_db_timestamp(start), _db_timestamp(end)))
         return cursor.fetchone()
 
-def get_product_statistics():
+@db_read
+def get_sales_by_month(start, end):
     with get_db_connection() as conn:
         cursor = conn.execute("""
-            SELECT p.name_ru, COUNT(ci.id) as times_ordered, SUM(ci.quantity) as total_quantity
-            FROM cart_items ci
-            JOIN products p ON ci.product_id = p.id
-            JOIN orders o ON o.items LIKE '%' || p.id || '%'
-            WHERE o.status = 'delivered'
-            GROUP BY p.id
-            ORDER BY total_quantity DESC
-            LIMIT 10
-        """)
+            SELECT substr(day, 1, 7) as month, SUM(orders) as total_orders, 
+                   SUM(delivered) as delivered_orders, SUM(revenue) as total_revenue
+            FROM daily_sales 
+            WHERE day >= ? AND day < ?
+            GROUP BY month 
+            ORDER BY month
+        """, (start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+        return cursor.fetchall()
 
-def add_review(user_id, user_name, product_id, rating, review_text):
+@db_read
+def get_product_statistics(start=None, end=None):
+    period = "AND o.created_at >= ? AND o.created_at < ?" if start else ""
+    params = (_db_timestamp(start), _db_timestamp(end)) if start else ()
     with get_db_connection() as conn:
-        conn.execute("""INSERT INTO reviews (user_id, user_name, product_id, rating, review_text) 
-                        VALUES (?, ?, ?, ?, ?)""", 
-                     (user_id, user_name, product_id, rating, review_text))
-        conn.commit()
+        cursor = conn.execute(f"""
+            SELECT p.name_ru, COUNT(DISTINCT oi.order_id) as times_ordered, SUM(oi.quantity) as total_quantity
+            FROM order_items oi
+            JOIN orders o ON oi.order_id = o.id
+            JOIN products p ON oi.product_id = p.id
+            WHERE o.status = 'delivered' {period}
+            GROUP BY oi.product_id
+            ORDER BY total_quantity DESC
+            LIMIT 10
+        """, params)
+        return cursor.fetchall()
 
+# Сводка рейтинга (сумма, количество и гистограмма 1-5 по одобренным отзывам) хранится в product_ratings
+# и меняется в той же транзакции, что и сам отзыв
+def _apply_rating_delta(conn, product_id, rating, delta):
+    stars = f"stars_{int(rating)}"
+    conn.execute(f"""INSERT INTO product_ratings (product_id, rating_sum, rating_count, {stars}) 
+                     VALUES (?, ?, ?, ?) 
+                     ON CONFLICT(product_id) DO UPDATE SET 
+                         rating_sum = rating_sum + excluded.rating_sum, 
+                         rating_count = rating_count + excluded.rating_count, 
+                         {stars} = {stars} + excluded.{stars}""",
+                 (product_id, rating * delta, delta, delta))
+
+def _rebuild_rating_summaries(conn):
+    conn.execute("DELETE FROM product_ratings")
+    conn.execute("""INSERT INTO product_ratings 
+                        (product_id, rating_sum, rating_count, stars_1, stars_2, stars_3, stars_4, stars_5) 
+                    SELECT product_id, SUM(rating), COUNT(*), 
+                           SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5) 
+                    FROM reviews 
+                    WHERE is_approved = 1 
+                    GROUP BY product_id""")
+
+@db_write
+def _rebuild_rating_summaries_tx():
+    _rebuild_rating_summaries(get_db_connection())
+
+async def rebuild_rating_summaries():
+    await _rebuild_rating_summaries_tx()
+    await catalog_cache.rebuild()
+
+@db_write
+def _add_review(user_id, user_name, product_id, rating, review_text):
+    conn = get_db_connection()
+    review = conn.execute("""INSERT INTO reviews (user_id, user_name, product_id, rating, review_text) 
+                             VALUES (?, ?, ?, ?, ?) RETURNING is_approved""", 
+                          (user_id, user_name, product_id, rating, review_text)).fetchone()
+    if review['is_approved']:
+        _apply_rating_delta(conn, product_id, rating, 1)
+    return bool(review['is_approved'])
+
+async def add_review(user_id, user_name, product_id, rating, review_text):
+    # Рейтинг в каталоге меняется только если отзыв сразу одобрен
+    if await _add_review(user_id, user_name, product_id, rating, review_text):
+        await catalog_cache.rebuild()
+
+@db_read
 def get_product_reviews(product_id, approved_only=True):
     with get_db_connection() as conn:
         if approved_only:
@@ -2123,6 +1172,7 @@ def get_product_reviews(product_id, approved_only=True):
                                      ORDER BY created_at DESC""", (product_id,))
         return cursor.fetchall()
 
+@db_read
 def get_user_reviews(user_id):
     with get_db_connection() as conn:
         cursor = conn.execute("""SELECT r.*, p.name_ru 
@@ -2132,26 +1182,39 @@ def get_user_reviews(user_id):
                                  ORDER BY r.created_at DESC""", (user_id,))
         return cursor.fetchall()
 
-def approve_review(review_id):
+@db_write
+def _approve_review(review_id):
+    conn = get_db_connection()
+    review = conn.execute("""UPDATE reviews SET is_approved = 1 WHERE id = ? AND is_approved = 0 
+                             RETURNING product_id, rating""", (review_id,)).fetchone()
+    if review:
+        _apply_rating_delta(conn, review['product_id'], review['rating'], 1)
+    return review is not None
+
+@db_write
+def _delete_review(review_id):
+    conn = get_db_connection()
+    review = conn.execute("DELETE FROM reviews WHERE id = ? RETURNING product_id, rating, is_approved", 
+                          (review_id,)).fetchone()
+    if review and review['is_approved']:
+        _apply_rating_delta(conn, review['product_id'], review['rating'], -1)
+        return True
+    return False
+
+async def approve_review(review_id):
+    if await _approve_review(review_id):
+        await catalog_cache.rebuild()
+
+async def delete_review(review_id):
+    if await _delete_review(review_id):
+        await catalog_cache.rebuild()
+
+@db_read
+def get_rating_summary(product_id):
     with get_db_connection() as conn:
-        conn.execute("UPDATE reviews SET is_approved = 1 WHERE id = ?", (review_id,))
-        conn.commit()
-
-def delete_review(review_id):
-    with get_db_connection() as conn:
-        conn.execute("DELETE FROM reviews WHERE id = ?", (review_id,))
-        conn.commit()
-
-def get_average_rating(product_id):
-    with get_db_connection() as conn:
-        cursor = conn.execute("""SELECT AVG(rating) as avg_rating, COUNT(*) as review_count 
-                                 FROM reviews 
-                                 WHERE product_id = ? AND is_approved = 1""", (product_id,))
-        result = cursor.fetchone()
-        if result and result['avg_rating']:
-            return float(result['avg_rating']), result['review_count'] or 0
-        return 0, 0
+        return conn.execute("SELECT * FROM product_ratings WHERE product_id = ?", (product_id,)).fetchone()
 
+@db_read
 def get_pending_reviews():
     with get_db_connection() as conn:
         cursor = conn.execute("""SELECT r.*, p.name_ru, u.name 
@@ -2162,11 +1225,232 @@ def get_pending_reviews():
                                  ORDER BY r.created_at DESC""")
         return cursor.fetchall()
     
+def _recipients_filter(language, region):
+    clauses, params = [], []
+    if language:
+        clauses.append("language = ?")
+        params.append(language)
+    if region:
+        clauses.append("region = ?")
+        params.append(region)
+    return clauses, params
+
+@db_read
+def count_broadcast_recipients(language=None, region=None):
+    clauses, params = _recipients_filter(language, region)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_db_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM users {where}", params).fetchone()[0]
+
+@db_read
+def get_broadcast_recipients(language, region, after_user_id, limit):
+    clauses, params = _recipients_filter(language, region)
+    where = " AND ".join(["user_id > ?"] + clauses)
+    with get_db_connection() as conn:
+        cursor = conn.execute(f"SELECT user_id FROM users WHERE {where} ORDER BY user_id LIMIT ?",
+                              (after_user_id, *params, limit))
+        return [row[0] for row in cursor]
+
+@db_write
+def create_broadcast(admin_id, text, language=None, region=None):
+    conn = get_db_connection()
+    return conn.execute("""INSERT INTO broadcasts (admin_id, text, language, region) 
+                           VALUES (?, ?, ?, ?) RETURNING id""", 
+                        (admin_id, text, language, region)).fetchone()[0]
+
+@db_write
+def save_broadcast_progress(broadcast_id, last_user_id, delivered, blocked, failed):
+    conn = get_db_connection()
+    cursor = conn.execute("""UPDATE broadcasts 
+                             SET last_user_id = ?, delivered = delivered + ?, blocked = blocked + ?, failed = failed + ? 
+                             WHERE id = ? AND status = 'running'""", 
+                          (last_user_id, delivered, blocked, failed, broadcast_id))
+    return cursor.rowcount > 0
+
+@db_write
+def finish_broadcast(broadcast_id, status):
+    conn = get_db_connection()
+    cursor = conn.execute("""UPDATE broadcasts SET status = ?, finished_at = CURRENT_TIMESTAMP 
+                             WHERE id = ? AND status = 'running'""", (status, broadcast_id))
+    return cursor.rowcount > 0
+
+@db_read
+def get_broadcast(broadcast_id):
+    with get_db_connection() as conn:
+        return conn.execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+
+@db_read
+def get_running_broadcasts():
+    with get_db_connection() as conn:
+        return conn.execute("SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id").fetchall()
+@db_read
+def load_fsm_record(key):
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT state, data FROM fsm_storage WHERE key = ?", (key,)).fetchone()
+    return (row['state'], json.loads(row['data'])) if row else None
+
+@db_write
+def save_fsm_records(upserts, deletes):
+    conn = get_db_connection()
+    conn.executemany("""INSERT INTO fsm_storage (key, state, data) VALUES (?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data, 
+                                                       updated_at = CURRENT_TIMESTAMP""", upserts)
+    conn.executemany("DELETE FROM fsm_storage WHERE key = ?", [(k,) for k in deletes])
+
+# ================== ОГРАНИЧЕНИЕ ПАРАЛЛЕЛЬНОСТИ ==================
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    # И polling, и вебхук обрабатывают апдейты отдельными задачами без ограничения числа;
+    # семафор держит одновременно обрабатываемые апдейты в пределах UPDATES_MAX_CONCURRENCY
+    def __init__(self, limit):
+        self.semaphore = asyncio.Semaphore(limit)
+
+    async def __call__(self, handler, event, data):
+        async with self.semaphore:
+            return await handler(event, data)
+
+dp.update.outer_middleware(ConcurrencyLimitMiddleware(UPDATES_MAX_CONCURRENCY))
+
+# ================== КЭШ ПОЛЬЗОВАТЕЛЕЙ ==================
+class TTLCache:
+    # Ограниченный LRU-кэш с временем жизни записей. Используется только из event loop, поэтому без блокировок
+    MISSING = object()
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return self.MISSING
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return self.MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        # generation отсекает запись результата чтения, начатого до инвалидации
+        self.generation += 1
+        self._data.pop(key, None)
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+async def get_cached_user(user_id):
+    user = user_cache.get(user_id)
+    if user is TTLCache.MISSING:
+        generation = user_cache.generation
+        user = await get_user(user_id)
+        if generation == user_cache.generation:
+            user_cache.set(user_id, user)
+    return user
+
+purchase_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+async def user_has_purchased(user_id, product_id):
+    # Множество купленных товаров активного пользователя держим в памяти; сбрасывается при смене статуса заказа
+    purchased = purchase_cache.get(user_id)
+    if purchased is TTLCache.MISSING:
+        generation = purchase_cache.generation
+        purchased = await get_user_purchases(user_id)
+        if generation == purchase_cache.generation:
+            purchase_cache.set(user_id, purchased)
+    return product_id in purchased
+
+class UserProfileMiddleware(BaseMiddleware):
+    # Профиль отправителя загружается один раз на апдейт и передаётся в хендлеры аргументом user
+    async def __call__(self, handler, event, data):
+        from_user = data.get('event_from_user')
+        data['user'] = await get_cached_user(from_user.id) if from_user else None
+        return await handler(event, data)
+
+dp.update.outer_middleware(UserProfileMiddleware())
+
+# ================== КЭШ КАТАЛОГА ==================
+class CatalogSnapshot:
+    # Неизменяемый срез каталога: активные товары (со сводкой рейтинга) по id и по (категория, язык)
+    def __init__(self, version, rows):
+        self.version = version
+        self.by_id = {row['id']: row for row in rows}
+        by_category = {}
+        for row in rows:
+            by_category.setdefault((row['category_ru'], 'ru'), []).append(row)
+            by_category.setdefault((row['category_uz'], 'uz'), []).append(row)
+        self.by_category = {key: tuple(products) for key, products in by_category.items()}
+        # Отсортированные id категории - для keyset-пагинации бинарным поиском
+        self.category_ids = {key: tuple(row['id'] for row in products) for key, products in self.by_category.items()}
+        self.all_products = tuple(reversed(rows))
+
+class CatalogCache:
+    # Читатели всегда видят целый срез: новый собирается в стороне и подменяется одним присваиванием
+    def __init__(self):
+        self.version = 0
+        self.snapshot = CatalogSnapshot(0, [])
+        self._lock = asyncio.Lock()
+
+    async def rebuild(self):
+        self.version += 1
+        requested = self.version
+        async with self._lock:
+            # Загрузка, начатая уже после нашей мутации, её покрыла - повторно не читаем
+            if self.snapshot.version >= requested:
+                return
+            version = self.version
+            rows = await get_catalog_rows()
+            self.snapshot = CatalogSnapshot(version, rows)
+
+    def products_in_category(self, category, lang):
+        return self.snapshot.by_category.get((category, lang), ())
+
+    def category_page(self, category, lang, after_id=0, limit=1):
+        # Keyset-страница: товары категории с id > after_id, курсор - id, а не смещение
+        snapshot = self.snapshot
+        ids = snapshot.category_ids.get((category, lang), ())
+        start = bisect_right(ids, after_id)
+        return snapshot.by_category.get((category, lang), ())[start:start + limit]
+
+    def category_page_before(self, category, lang, before_id, limit=1):
+        snapshot = self.snapshot
+        ids = snapshot.category_ids.get((category, lang), ())
+        end = bisect_left(ids, before_id)
+        return snapshot.by_category.get((category, lang), ())[max(0, end - limit):end]
+
+    def category_position(self, category, lang, product_id):
+        ids = self.snapshot.category_ids.get((category, lang), ())
+        return bisect_left(ids, product_id) + 1, len(ids)
+
+    def all_products(self):
+        return self.snapshot.all_products
+
+    async def get_product(self, product_id):
+        product = self.snapshot.by_id.get(product_id)
+        if product is None:
+            # Скрытые товары в кэше не держим, но они нужны для старых заказов и отзывов
+            product = await get_product_by_id(product_id)
+        return product
+
+catalog_cache = CatalogCache()
 
 # ================== КЛАВИАТУРЫ ==================
+# Статические клавиатуры зависят только от языка: каждая строится один раз (lru_cache) и дальше
+# отдаётся готовым объектом. ReplyKeyboardMarkup и InlineKeyboardMarkup в aiogram изменяемые, а закэшированный
+# объект общий для всех апдейтов: менять его нельзя. Нужна другая клавиатура - стройте новую или берите model_copy()
+LANGUAGES = ('ru', 'uz')
+
+@lru_cache(maxsize=None)
 def get_language_keyboard():
     return ReplyKeyboardBuilder().add(KeyboardButton(text="🇷🇺 Русский"), KeyboardButton(text="🇺🇿 O'zbekcha")).as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_contact_keyboard(lang):
     builder = ReplyKeyboardBuilder()
     text_send = "📞 Отправить контакт" if lang == 'ru' else "📞 Kontaktni yuborish"
@@ -2177,21 +1461,24 @@ def get_contact_keyboard(lang):
     builder.adjust(1)
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_region_keyboard(lang):
     builder = ReplyKeyboardBuilder()
-    for key in REGIONS:
-        builder.add(KeyboardButton(text=REGIONS[key][lang]))
+    for text in geo_store.regions(lang).values():
+        builder.add(KeyboardButton(text=text))
     builder.adjust(2)
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_post_keyboard(region_key, lang):
     builder = ReplyKeyboardBuilder()
-    offices = POST_OFFICES.get(region_key, {}).get(lang, [])
+    offices = geo_store.post_offices(region_key, lang)
     for office in offices:
-        builder.add(KeyboardButton(text=office))
+        builder.add(KeyboardButton(text=office_button_text(office)))
     builder.adjust(1)
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_main_menu(lang):
     menu = ["🛍️ Каталог", "🛒 Корзина", "📦 Мои заказы", "⭐ Отзывы", "ℹ️ Помощь"] if lang == 'ru' else ["🛍️ Katalog", "🛒 Savat", "📦 Buyurtmalarim", "⭐ Sharhlar", "ℹ️ Yordam"]
     builder = ReplyKeyboardBuilder()
@@ -2199,6 +1486,7 @@ def get_main_menu(lang):
     builder.adjust(2)
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_catalog_keyboard(lang):
     cats = ["👕 Формы 2024/2025", "⚽ Бутсы", "🔙 Назад"] if lang == 'ru' else ["👕 2024/2025 Formalari", "⚽ Butsalar", "🔙 Orqaga"]
     builder = ReplyKeyboardBuilder()
@@ -2224,14 +1512,16 @@ def get_cart_keyboard(lang, cart_items):
     builder.adjust(1)
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_admin_kb():
     builder = ReplyKeyboardBuilder()
-    buttons = ["➕ Добавить товар", "📦 Управление товарами", "📊 Статистика", "📋 Все заказы", "🔙 Выход"]
+    buttons = ["➕ Добавить товар", "📦 Управление товарами", "📊 Статистика", "📋 Все заказы", "📢 Рассылка", "🔙 Выход"]
     for btn in buttons:
         builder.add(KeyboardButton(text=btn))
     builder.adjust(2)
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_products_management_kb():
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text="✏️ Редактировать", callback_data="edit_products"))
@@ -2251,25 +1541,64 @@ def get_products_list_kb(products, action):
     builder.adjust(1)
     return builder.as_markup()
 
+# Шаблон кнопок статусов готовится один раз; в заказ подставляется только id.
+# model_construct не перепроверяет заведомо корректные данные шаблона
+ORDER_STATUS_KB_TEMPLATE = tuple(
+    (ORDER_STATUSES[status]['ru'], status)
+    for status in ['waiting_confirm', 'confirmed', 'shipping', 'delivered', 'cancelled']
+)
+
 def get_order_status_kb(order_id):
-    builder = InlineKeyboardBuilder()
-    statuses = ['waiting_confirm', 'confirmed', 'shipping', 'delivered', 'cancelled']
-    for status in statuses:
-        builder.add(InlineKeyboardButton(
-            text=ORDER_STATUSES[status]['ru'],
-            callback_data=f"setstatus_{order_id}_{status}"
-        ))
-    builder.adjust(1)
-    return builder.as_markup()
+    return InlineKeyboardMarkup.model_construct(inline_keyboard=[
+        [InlineKeyboardButton.model_construct(text=text, callback_data=f"setstatus_{order_id}_{status}")]
+        for text, status in ORDER_STATUS_KB_TEMPLATE
+    ])
 
+@lru_cache(maxsize=None)
 def get_statistics_kb():
     builder = InlineKeyboardBuilder()
-    builder.add(InlineKeyboardButton(text="📊 Текущий месяц", callback_data="stats_current"))
+    builder.add(InlineKeyboardButton(text="📅 Сегодня", callback_data="stats_period_day"))
+    builder.add(InlineKeyboardButton(text="🗓 Неделя", callback_data="stats_period_week"))
+    builder.add(InlineKeyboardButton(text="📊 Текущий месяц", callback_data="stats_period_month"))
+    builder.add(InlineKeyboardButton(text="📆 Год", callback_data="stats_period_year"))
+    builder.add(InlineKeyboardButton(text="🔎 Свой период", callback_data="stats_custom"))
     builder.add(InlineKeyboardButton(text="📈 Продажи по товарам", callback_data="stats_products"))
     builder.add(InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_admin"))
-    builder.adjust(1)
+    builder.adjust(2, 2, 1, 1, 1)
+    return builder.as_markup()
+
+BROADCAST_AUDIENCES = {
+    "👥 Всем": None,
+    "🇷🇺 Русский": 'ru',
+    "🇺🇿 O'zbek": 'uz',
+}
+
+@lru_cache(maxsize=None)
+def get_broadcast_audience_kb():
+    builder = ReplyKeyboardBuilder()
+    for text in [*BROADCAST_AUDIENCES, "📍 По региону", "🔙 Назад"]:
+        builder.add(KeyboardButton(text=text))
+    builder.adjust(3, 2)
+    return builder.as_markup(resize_keyboard=True)
+
+@lru_cache(maxsize=None)
+def get_broadcast_confirm_kb():
+    builder = InlineKeyboardBuilder()
+    builder.add(InlineKeyboardButton(text="✅ Отправить", callback_data="broadcast_confirm"))
+    builder.add(InlineKeyboardButton(text="❌ Отмена", callback_data="broadcast_cancel"))
+    builder.adjust(2)
+    return builder.as_markup()
 
 def get_reviews_keyboard(lang, product_id=None):
+    if product_id is None:
+        return _get_reviews_menu_keyboard(lang)
+    return _build_reviews_keyboard(lang, product_id)
+
+@lru_cache(maxsize=None)
+def _get_reviews_menu_keyboard(lang):
+    return _build_reviews_keyboard(lang)
+
+def _build_reviews_keyboard(lang, product_id=None):
     builder = InlineKeyboardBuilder()
     
     if lang == 'ru':
@@ -2286,6 +1615,7 @@ def get_reviews_keyboard(lang, product_id=None):
     builder.adjust(1)
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_rating_keyboard(lang):
     builder = InlineKeyboardBuilder()
     
@@ -2311,6 +1641,7 @@ def get_rating_keyboard(lang):
     builder.adjust(5)
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_reviews_admin_kb():
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text="👁️ Просмотр отзывов", callback_data="view_reviews_admin"))
@@ -2319,11 +1650,290 @@ def get_reviews_admin_kb():
     builder.adjust(2)
     return builder.as_markup()
     
+def get_carousel_kb(prod, lang):
+    position, total = catalog_cache.category_position(
+        prod['category_ru'] if lang == 'ru' else prod['category_uz'], lang, prod['id'])
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(text="◀️", callback_data=f"carousel_prev_{prod['id']}" if position > 1 else "noop"),
+        InlineKeyboardButton(text=f"{position}/{total}", callback_data="noop"),
+        InlineKeyboardButton(text="▶️", callback_data=f"carousel_next_{prod['id']}" if position < total else "noop"),
+    )
+    # Суффикс _keep: после добавления в корзину клавиатуру карусели не убираем
+    if lang == 'ru':
+        builder.row(InlineKeyboardButton(text="🛒 В корзину", callback_data=f"addtocart_{prod['id']}_keep"),
+                    InlineKeyboardButton(text="⭐ Отзывы", callback_data=f"show_reviews_{prod['id']}"))
+        builder.row(InlineKeyboardButton(text="🖼 Показать альбомом", callback_data=f"catalogview_album_{prod['id']}"))
+    else:
+        builder.row(InlineKeyboardButton(text="🛒 Savatga", callback_data=f"addtocart_{prod['id']}_keep"),
+                    InlineKeyboardButton(text="⭐ Sharhlar", callback_data=f"show_reviews_{prod['id']}"))
+        builder.row(InlineKeyboardButton(text="🖼 Albom ko'rinishida", callback_data=f"catalogview_album_{prod['id']}"))
+    return builder.as_markup()
+
+def get_pager_kb(prefix, newer_id=None, older_id=None, lang='ru'):
+    buttons = pager_row(prefix, newer_id, older_id, lang)
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+
+def pager_row(prefix, newer_id=None, older_id=None, lang='ru'):
+    # Листание списков от новых к старым; в callback только id крайнего элемента страницы
+    buttons = []
+    if newer_id is not None:
+        buttons.append(InlineKeyboardButton(text="⬅️ Новее" if lang == 'ru' else "⬅️ Yangiroq", 
+                                            callback_data=f"{prefix}_newer_{newer_id}"))
+    if older_id is not None:
+        buttons.append(InlineKeyboardButton(text="Старее ➡️" if lang == 'ru' else "Eskiroq ➡️", 
+                                            callback_data=f"{prefix}_older_{older_id}"))
+    return buttons
+
+ADMIN_ORDER_FILTERS = (("Все", "all"),) + tuple((texts['ru'], status) for status, texts in ORDER_STATUSES.items())
+
+def get_admin_orders_kb(status_filter, newer_id=None, older_id=None):
+    builder = InlineKeyboardBuilder()
+    for text, value in ADMIN_ORDER_FILTERS:
+        mark = "• " if value == status_filter else ""
+        builder.add(InlineKeyboardButton(text=f"{mark}{text}", callback_data=f"aorders_{value}_first_0"))
+    builder.adjust(3)
+    nav = pager_row(f"aorders_{status_filter}", newer_id, older_id)
+    if nav:
+        builder.row(*nav)
+    return builder.as_markup()
+
+def get_album_kb(products, lang, first, last, total):
+    builder = InlineKeyboardBuilder()
+    for i, prod in enumerate(products, 1):
+        name = prod['name_ru'] if lang == 'ru' else prod['name_uz']
+        builder.row(InlineKeyboardButton(text=f"🛒 {i}. {name}", callback_data=f"addtocart_{prod['id']}_keep"),
+                    InlineKeyboardButton(text="⭐", callback_data=f"show_reviews_{prod['id']}"))
+    nav = []
+    if first > 1:
+        nav.append(InlineKeyboardButton(text="◀️", callback_data=f"album_prev_{products[0]['id']}"))
+    if last < total:
+        nav.append(InlineKeyboardButton(text="▶️", callback_data=f"album_next_{products[-1]['id']}"))
+    if nav:
+        builder.row(*nav)
+    builder.row(InlineKeyboardButton(text="🎠 Карусель" if lang == 'ru' else "🎠 Karusel",
+                                     callback_data=f"catalogview_carousel_{products[0]['id']}"))
+    return builder.as_markup()
+
+# Прогреваем все статические клавиатуры при старте
+def build_keyboards():
+    get_language_keyboard()
+    get_admin_kb()
+    get_products_management_kb()
+    get_statistics_kb()
+    get_reviews_admin_kb()
+    for lang in LANGUAGES:
+        get_contact_keyboard(lang)
+        get_region_keyboard(lang)
+        get_main_menu(lang)
+        get_catalog_keyboard(lang)
+        get_rating_keyboard(lang)
+        get_reviews_keyboard(lang)
+
+build_keyboards()
+
+# ================== ОЧЕРЕДЬ ОТПРАВКИ ==================
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, cost=1):
+        # Забираем токены сразу (баланс может уйти в минус) и возвращаем, сколько ждать своей очереди.
+        # Все вызовы идут из одного event loop, поэтому блокировка не нужна
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= cost
+        return max(0.0, -self.tokens / self.rate, self.paused_until - now)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def idle(self, now):
+        return now >= self.paused_until and self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+class SendScheduler(BaseRequestMiddleware):
+    # Все исходящие запросы с chat_id проходят через общий и поштучный лимиты Telegram,
+    # 429 и сетевые сбои повторяются здесь, а не в каждом обработчике
+    def __init__(self):
+        self.global_bucket = TokenBucket(SEND_GLOBAL_RATE, SEND_GLOBAL_RATE)
+        self.chat_buckets = {}
+        self.flood_hits = {}  # chat_id -> время последнего 429
+        self.waiting = 0
+        self.in_flight = 0
+        self.retried = 0
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= SEND_CHAT_BUCKETS_MAX:
+                now = time.monotonic()
+                self.chat_buckets = {k: b for k, b in self.chat_buckets.items() if not b.idle(now)}
+            rate = SEND_GROUP_RATE if isinstance(chat_id, str) or chat_id < 0 else SEND_CHAT_RATE
+            bucket = self.chat_buckets[chat_id] = TokenBucket(rate, SEND_CHAT_BURST)
+        return bucket
+
+    def _on_retry_after(self, chat_id, retry_after):
+        # Обычно 429 относится к одному чату - придерживаем только его. Если ответы приходят
+        # сразу в нескольких чатах, упёрлись в общий лимит бота и ставим на паузу всю отправку
+        self._chat_bucket(chat_id).pause(retry_after)
+        now = time.monotonic()
+        self.flood_hits[chat_id] = now
+        self.flood_hits = {k: t for k, t in self.flood_hits.items() if now - t <= SEND_FLOOD_WINDOW}
+        if len(self.flood_hits) >= SEND_FLOOD_CHATS:
+            self.global_bucket.pause(retry_after)
+            logger.warning(f"RetryAfter {retry_after}s в {len(self.flood_hits)} чатах - пауза всей отправки")
+        else:
+            logger.warning(f"RetryAfter {retry_after}s для чата {chat_id}")
+
+    async def _acquire(self, chat_id, cost):
+        self.waiting += 1
+        try:
+            # В чат альбом уходит одним сообщением: цена больше ёмкости чатового ведра
+            # заставила бы ждать его пополнения при каждой странице
+            await asyncio.sleep(self._chat_bucket(chat_id).reserve(1))
+            await asyncio.sleep(self.global_bucket.reserve(cost))
+        finally:
+            self.waiting -= 1
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        # В общем лимите альбом Telegram считает как отдельные сообщения; у EditMessageMedia media - один объект
+        cost = len(method.media) if isinstance(method, SendMediaGroup) else 1
+        attempt = 0
+        while True:
+            await self._acquire(chat_id, cost)
+            self.in_flight += 1
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= SEND_MAX_RETRIES:
+                    raise
+                self._on_retry_after(chat_id, e.retry_after)
+                delay = 0
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt >= SEND_MAX_RETRIES:
+                    raise
+                delay = random.uniform(0.5, 1) * SEND_BACKOFF_BASE * 2 ** attempt
+                logger.warning(f"Повтор отправки в чат {chat_id} после ошибки: {e}")
+            finally:
+                self.in_flight -= 1
+            attempt += 1
+            self.retried += 1
+            if delay:
+                self.waiting += 1
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self.waiting -= 1
+
+    def stats(self):
+        return {'waiting': self.waiting, 'in_flight': self.in_flight, 'retried': self.retried,
+                'chats': len(self.chat_buckets)}
+
+send_scheduler = SendScheduler()
+bot.session.middleware(send_scheduler)
+
+# ================== ФОНОВЫЕ УВЕДОМЛЕНИЯ ==================
+# Ссылки на фоновые задачи держим, чтобы их не собрал GC, и дожидаемся их при остановке
+_background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _send_to_admin(semaphore, admin_id, photo_id, caption):
+    # Лимиты и повторы берёт на себя send_scheduler, сюда доходят только окончательные ошибки
+    async with semaphore:
+        try:
+            await bot.send_photo(admin_id, photo_id, caption=caption)
+        except TelegramAPIError as e:
+            logger.error(f"Error sending to admin {admin_id}: {e}")
+
+async def notify_admins(photo_id, caption):
+    # Всем админам параллельно, но не больше ADMIN_NOTIFY_CONCURRENCY отправок одновременно
+    semaphore = asyncio.Semaphore(ADMIN_NOTIFY_CONCURRENCY)
+    await asyncio.gather(*(_send_to_admin(semaphore, admin_id, photo_id, caption) for admin_id in ADMIN_IDS))
+
+# ================== РАССЫЛКИ ==================
+# Получатели читаются из БД порциями по user_id, после каждой порции прогресс сохраняется:
+# после перезапуска рассылка продолжается с last_user_id (повторно может уйти не больше одной порции)
+_broadcast_tasks = {}
+
+async def _deliver_broadcast(semaphore, user_id, text):
+    async with semaphore:
+        try:
+            await bot.send_message(user_id, text)
+            return 'delivered'
+        except TelegramForbiddenError:
+            return 'blocked'
+        except TelegramAPIError as e:
+            logger.warning(f"Рассылка: не доставлено {user_id}: {e}")
+            return 'failed'
+
+def broadcast_status_text(broadcast):
+    audience = broadcast['language'] or broadcast['region'] or "все"
+    return (f"📢 Рассылка #{broadcast['id']} ({audience}): {broadcast['status']}\n"
+            f"✅ Доставлено: {broadcast['delivered']}\n"
+            f"🚫 Заблокировали бота: {broadcast['blocked']}\n"
+            f"⚠️ Ошибки: {broadcast['failed']}")
+
+async def run_broadcast(broadcast_id):
+    broadcast = await get_broadcast(broadcast_id)
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    last_user_id = broadcast['last_user_id']
+    while True:
+        chunk = await get_broadcast_recipients(broadcast['language'], broadcast['region'], 
+                                               last_user_id, BROADCAST_CHUNK_SIZE)
+        if not chunk:
+            break
+        results = await asyncio.gather(*(_deliver_broadcast(semaphore, user_id, broadcast['text']) for user_id in chunk))
+        last_user_id = chunk[-1]
+        if not await save_broadcast_progress(broadcast_id, last_user_id, results.count('delivered'),
+                                             results.count('blocked'), results.count('failed')):
+            return  # рассылку остановили
+    
+    if await finish_broadcast(broadcast_id, 'done'):
+        broadcast = await get_broadcast(broadcast_id)
+        try:
+            await bot.send_message(broadcast['admin_id'], broadcast_status_text(broadcast))
+        except TelegramAPIError as e:
+            logger.error(f"Не удалось отправить отчёт о рассылке #{broadcast_id}: {e}")
+
+def _broadcast_done(broadcast_id, task):
+    _broadcast_tasks.pop(broadcast_id, None)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Рассылка #{broadcast_id} прервана ошибкой: {task.exception()}")
+
+def start_broadcast(broadcast_id):
+    task = asyncio.create_task(run_broadcast(broadcast_id))
+    _broadcast_tasks[broadcast_id] = task
+    task.add_done_callback(partial(_broadcast_done, broadcast_id))
+    return task
+
+async def resume_broadcasts():
+    for broadcast in await get_running_broadcasts():
+        logger.info(f"Возобновляем рассылку #{broadcast['id']} с user_id > {broadcast['last_user_id']}")
+        start_broadcast(broadcast['id'])
+
+async def stop_broadcasts():
+    # При остановке бота рассылки не завершаются, а остаются running и продолжатся после запуска
+    tasks = list(_broadcast_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 # ================== ЛОГИКА: СТАРТ И РЕГИСТРАЦИЯ ==================
 @dp.message(Command("start"))
-async def cmd_start(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
+async def cmd_start(message: types.Message, state: FSMContext, user: sqlite3.Row):
     if user:
         await message.answer("👋 С возвращением!" if user['language'] == 'ru' else "👋 Xush kelibsiz!", 
                            reply_markup=get_main_menu(user['language']))
@@ -2408,11 +2018,7 @@ async def name_entered_manually(message: types.Message, state: FSMContext):
 @dp.message(OrderFlow.choosing_region)
 async def region_chosen(message: types.Message, state: FSMContext):
     data = await state.get_data()
-    found_key = None
-    for key, vals in REGIONS.items():
-        if message.text in vals.values():
-            found_key = key
-            break
+    found_key = geo_store.region_by_text(message.text)
     
     if not found_key:
         return await message.answer("❌ Выберите из списка / Ro'yxatdan tanlang")
@@ -2427,8 +2033,11 @@ async def post_chosen(message: types.Message, state: FSMContext):
     data = await state.get_data()
     lang = data.get('lang', 'ru') # Безопасное получение языка
     
+    if geo_store.find_office(data['region'], message.text) is None:
+        return await message.answer("❌ Выберите из списка / Ro'yxatdan tanlang")
+    
     # Сохраняем в БД
-    save_user(message.from_user.id, data['phone'], data['name'], lang, data['region'], message.text)
+    await save_user(message.from_user.id, data['phone'], data['name'], lang, data['region'], message.text)
     
     # Сначала переключаем состояние, потом отправляем меню
     await state.set_state(OrderFlow.main_menu)
@@ -2441,16 +2050,14 @@ async def post_chosen(message: types.Message, state: FSMContext):
 
 # ================== ЛОГИКА: МАГАЗИН ==================
 @dp.message(OrderFlow.main_menu, F.text.in_(["🛍️ Каталог", "🛍️ Katalog"]))
-async def show_catalog(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
+async def show_catalog(message: types.Message, state: FSMContext, user: sqlite3.Row):
     await message.answer("📂 Категории / Bo'limlar:", 
                        reply_markup=get_catalog_keyboard(user['language']))
     await state.set_state(OrderFlow.choosing_category)
 
 @dp.message(OrderFlow.main_menu, F.text.in_(["🛒 Корзина", "🛒 Savat"]))
-async def show_cart(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
-    cart_items = get_cart_items(message.from_user.id)
+async def show_cart(message: types.Message, state: FSMContext, user: sqlite3.Row):
+    cart_items = await get_cart_items(message.from_user.id)
     
     if not cart_items:
         await message.answer("🛒 Корзина пуста / Savat bo'sh" if user['language'] == 'ru' else "🛒 Savat bo'sh")
@@ -2469,29 +2076,44 @@ async def show_cart(message: types.Message, state: FSMContext):
     await state.set_state(OrderFlow.viewing_cart)
 
 @dp.message(OrderFlow.main_menu, F.text.in_(["📦 Мои заказы", "📦 Buyurtmalarim"]))
-async def show_my_orders(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
-    orders = get_user_orders(message.from_user.id)
+async def show_my_orders(message: types.Message, state: FSMContext, user: sqlite3.Row):
+    orders, has_newer, has_older = await get_user_orders_page(message.from_user.id)
     
     if not orders:
         await message.answer("📦 У вас пока нет заказов / Hozircha buyurtmalaringiz yo'q")
         return
     
-    text = "📦 Ваши заказы:\n\n" if user['language'] == 'ru' else "📦 Sizning buyurtmalaringiz:\n\n"
+    text, kb = my_orders_page(orders, has_newer, has_older, user['language'])
+    await message.answer(text, reply_markup=kb)
+    await state.set_state(OrderFlow.viewing_orders)
+
+def my_orders_page(orders, has_newer, has_older, lang):
+    text = "📦 Ваши заказы:\n\n" if lang == 'ru' else "📦 Sizning buyurtmalaringiz:\n\n"
     
     for order in orders:
-        status_text = ORDER_STATUSES.get(order['status'], {}).get(user['language'], order['status'])
+        status_text = ORDER_STATUSES.get(order['status'], {}).get(lang, order['status'])
         text += f"📦 Заказ #{order['id']}\n"
         text += f"💰 Сумма: {order['total_price']} UZS\n"
         text += f"📊 Статус: {status_text}\n"
         text += f"📅 Дата: {order['created_at'][:10]}\n\n"
     
-    await message.answer(text)
-    await state.set_state(OrderFlow.viewing_orders)
+    kb = get_pager_kb("myorders", orders[0]['id'] if has_newer else None, 
+                      orders[-1]['id'] if has_older else None, lang)
+    return text, kb
+
+@dp.callback_query(F.data.startswith("myorders_"))
+async def my_orders_navigate(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    _, direction, order_id = callback.data.split("_")
+    orders, has_newer, has_older = await get_user_orders_page(callback.from_user.id, int(order_id), direction)
+    if not orders:
+        return await callback.answer()
+    
+    text, kb = my_orders_page(orders, has_newer, has_older, user['language'])
+    await callback.message.edit_text(text, reply_markup=kb)
+    await callback.answer()
 
 @dp.message(OrderFlow.main_menu, F.text.in_(["ℹ️ Помощь", "ℹ️ Yordam"]))
-async def show_help(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
+async def show_help(message: types.Message, state: FSMContext, user: sqlite3.Row):
     lang = user['language']
     
     if lang == 'ru':
@@ -2533,39 +2155,52 @@ J: Viloyatga qarab 1-3 kun."""
     
     await message.answer(text, parse_mode="Markdown")
 
+def product_caption(prod, lang):
+    # Рейтинг товара пришёл вместе с товаром
+    review_count = prod['rating_count']
+    avg_rating = prod['rating_sum'] / review_count if review_count else 0
+    rating_text = ""
+    
+    if avg_rating > 0:
+        stars = "⭐" * int(round(avg_rating))
+        if lang == 'ru':
+            rating_text = f"⭐ Рейтинг: {avg_rating:.1f} {stars} ({review_count} отзывов)\n"
+        else:
+            rating_text = f"⭐ Reyting: {avg_rating:.1f} {stars} ({review_count} sharh)\n"
+    else:
+        if lang == 'ru':
+            rating_text = "⭐ Ещё нет отзывов\n"
+        else:
+            rating_text = "⭐ Hozircha sharhlar yo'q\n"
+    
+    # Формируем описание товара
+    return f"👕 <b>{prod['name_ru'] if lang == 'ru' else prod['name_uz']}</b>\n{rating_text}💸 {prod['price']} UZS"
+
 @dp.message(OrderFlow.choosing_category)
-async def show_products(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
+async def show_products(message: types.Message, state: FSMContext, user: sqlite3.Row):
     lang = user['language']
     
     if "Назад" in message.text or "Orqaga" in message.text:
         await message.answer("🏠 Меню", reply_markup=get_main_menu(lang))
         return await state.set_state(OrderFlow.main_menu)
 
-    products = get_products_by_category(message.text, lang)
-    if not products:
+    if not await send_catalog(message, message.text, lang, user['catalog_view'] or CATALOG_VIEW):
         await message.answer("😕 Пока пусто / Hozircha bo'sh")
-        return
+
+async def send_catalog(message, category, lang, view):
+    if view == 'carousel':
+        return await send_carousel(message, category, lang)
+    if view == 'album':
+        return await send_album_page(message, category, lang)
+    return await send_product_list(message, category, lang)
+
+async def send_product_list(message, category, lang):
+    products = catalog_cache.products_in_category(category, lang)
+    if not products:
+        return False
 
     for prod in products:
-        # Получаем рейтинг товара
-        avg_rating, review_count = get_average_rating(prod['id'])
-        rating_text = ""
-        
-        if avg_rating > 0:
-            stars = "⭐" * int(round(avg_rating))
-            if lang == 'ru':
-                rating_text = f"⭐ Рейтинг: {avg_rating:.1f} {stars} ({review_count} отзывов)\n"
-            else:
-                rating_text = f"⭐ Reyting: {avg_rating:.1f} {stars} ({review_count} sharh)\n"
-        else:
-            if lang == 'ru':
-                rating_text = "⭐ Ещё нет отзывов\n"
-            else:
-                rating_text = "⭐ Hozircha sharhlar yo'q\n"
-        
-        # Формируем описание товара
-        caption = f"👕 <b>{prod['name_ru'] if lang == 'ru' else prod['name_uz']}</b>\n{rating_text}💸 {prod['price']} UZS"
+        caption = product_caption(prod, lang)
         
         # Создаём клавиатуру с двумя кнопками
         kb = InlineKeyboardBuilder()
@@ -2579,14 +2214,126 @@ async def show_products(message: types.Message, state: FSMContext):
         
         try:
             await message.answer_photo(prod['image_url'], caption=caption, parse_mode="HTML", reply_markup=kb.as_markup())
-        except:
+        except TelegramBadRequest:
             await message.answer(caption, parse_mode="HTML", reply_markup=kb.as_markup())
+    return True
+
+async def send_carousel(message, category, lang):
+    products = catalog_cache.category_page(category, lang)
+    if not products:
+        return False
+    prod = products[0]
+    caption = product_caption(prod, lang)
+    kb = get_carousel_kb(prod, lang)
+    try:
+        await message.answer_photo(prod['image_url'], caption=caption, parse_mode="HTML", reply_markup=kb)
+    except TelegramBadRequest:
+        await message.answer(caption, parse_mode="HTML", reply_markup=kb)
+    return True
+
+# Альбомы: страница до 10 товаров уходит одним send_media_group, за ней - одно сообщение
+# с кнопками корзины/отзывов для всей страницы и навигацией по страницам
+async def send_album_page(message, category, lang, after_id=0, before_id=None):
+    if before_id is not None:
+        products = catalog_cache.category_page_before(category, lang, before_id, ALBUM_PAGE_SIZE)
+    else:
+        products = catalog_cache.category_page(category, lang, after_id, ALBUM_PAGE_SIZE)
+    if not products:
+        return False
+    
+    captions = [f"{i}. {product_caption(prod, lang)}" for i, prod in enumerate(products, 1)]
+    try:
+        if len(products) == 1:
+            await message.answer_photo(products[0]['image_url'], caption=captions[0], parse_mode="HTML")
+        else:
+            await message.answer_media_group([
+                InputMediaPhoto(media=prod['image_url'], caption=caption, parse_mode="HTML")
+                for prod, caption in zip(products, captions)
+            ])
+    except TelegramBadRequest:
+        await message.answer("\n\n".join(captions), parse_mode="HTML")
+    
+    first, total = catalog_cache.category_position(category, lang, products[0]['id'])
+    last = first + len(products) - 1
+    await message.answer(f"📄 {first}–{last} / {total}", reply_markup=get_album_kb(products, lang, first, last, total))
+    return True
+
+# Карусель: одно сообщение с товаром, ◀️/▶️ меняют его на месте через edit_media.
+# Соседний товар ищется keyset-запросом по id к срезу каталога в памяти
+@dp.callback_query(F.data.startswith("carousel_"))
+async def carousel_navigate(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    _, direction, product_id = callback.data.split("_")
+    lang = user['language']
+    
+    current = await catalog_cache.get_product(int(product_id))
+    if not current:
+        return await callback.answer("😕 Пока пусто / Hozircha bo'sh")
+    
+    category = current['category_ru'] if lang == 'ru' else current['category_uz']
+    if direction == 'next':
+        products = catalog_cache.category_page(category, lang, after_id=current['id'])
+    else:
+        products = catalog_cache.category_page_before(category, lang, before_id=current['id'])
+    if not products:
+        return await callback.answer()
+    
+    prod = products[0]
+    caption = product_caption(prod, lang)
+    kb = get_carousel_kb(prod, lang)
+    try:
+        if callback.message.photo:
+            try:
+                await callback.message.edit_media(
+                    InputMediaPhoto(media=prod['image_url'], caption=caption, parse_mode="HTML"), reply_markup=kb)
+            except TelegramBadRequest:
+                # Фото товара недоступно — у фото-сообщения можно сменить только подпись и кнопки
+                await callback.message.edit_caption(caption=caption, parse_mode="HTML", reply_markup=kb)
+        else:
+            await callback.message.edit_text(caption, parse_mode="HTML", reply_markup=kb)
+    except TelegramBadRequest as e:
+        logger.warning(f"Не удалось пролистать карусель: {e}")
+    finally:
+        await callback.answer()
+
+@dp.callback_query(F.data.startswith("album_"))
+async def album_navigate(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    _, direction, product_id = callback.data.split("_")
+    lang = user['language']
+    
+    current = await catalog_cache.get_product(int(product_id))
+    if not current:
+        return await callback.answer("😕 Пока пусто / Hozircha bo'sh")
+    
+    category = current['category_ru'] if lang == 'ru' else current['category_uz']
+    if direction == 'next':
+        found = await send_album_page(callback.message, category, lang, after_id=current['id'])
+    else:
+        found = await send_album_page(callback.message, category, lang, before_id=current['id'])
+    if found:
+        # Навигация страницы больше не нужна - у новой страницы своя
+        await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer()
+
+@dp.callback_query(F.data.startswith("catalogview_"))
+async def switch_catalog_view(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    _, view, product_id = callback.data.split("_")
+    lang = user['language']
+    
+    current = await catalog_cache.get_product(int(product_id))
+    await set_catalog_view(callback.from_user.id, view)
+    if current:
+        category = current['category_ru'] if lang == 'ru' else current['category_uz']
+        await send_catalog(callback.message, category, lang, view)
+    await callback.answer()
+
+@dp.callback_query(F.data == "noop")
+async def noop_callback(callback: types.CallbackQuery):
+    await callback.answer()
 
             # ================== ЛОГИКА: ОТЗЫВЫ ==================
 
 @dp.message(OrderFlow.main_menu, F.text.in_(["⭐ Отзывы", "⭐ Sharhlar"]))
-async def show_reviews_menu(message: types.Message, state: FSMContext):
-    user = get_user(message.from_user.id)
+async def show_reviews_menu(message: types.Message, state: FSMContext, user: sqlite3.Row):
     lang = user['language']
     
     if lang == 'ru':
@@ -2601,23 +2348,30 @@ async def show_reviews_menu(message: types.Message, state: FSMContext):
 # Обновите функцию show_products - добавьте кнопку "Отзывы" рядом с "Добавить в корзину"
 
 @dp.callback_query(F.data.startswith("show_reviews_"))
-async def show_product_reviews(callback: types.CallbackQuery, state: FSMContext):
+async def show_product_reviews(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     product_id = int(callback.data.split("_")[2])
-    user = get_user(callback.from_user.id)
     lang = user['language']
     
-    reviews = get_product_reviews(product_id, approved_only=True)
-    avg_rating, review_count = get_average_rating(product_id)
-    product = get_product_by_id(product_id)
+    reviews = await get_product_reviews(product_id, approved_only=True)
+    summary = await get_rating_summary(product_id)
+    product = await catalog_cache.get_product(product_id)
     
     product_name = product['name_ru'] if lang == 'ru' else product['name_uz']
+    review_count = summary['rating_count'] if summary else 0
+    avg_rating = summary['rating_sum'] / review_count if review_count else 0
     
     if lang == 'ru':
         text = f"⭐ **Отзывы о товаре:** {product_name}\n\n"
-        text += f"📊 **Средний рейтинг:** {avg_rating:.1f} ⭐ ({review_count} отзывов)\n\n"
+        text += f"📊 **Средний рейтинг:** {avg_rating:.1f} ⭐ ({review_count} отзывов)\n"
     else:
         text = f"⭐ **Mahsulot sharhlari:** {product_name}\n\n"
-        text += f"📊 **O'rtacha reyting:** {avg_rating:.1f} ⭐ ({review_count} sharh)\n\n"
+        text += f"📊 **O'rtacha reyting:** {avg_rating:.1f} ⭐ ({review_count} sharh)\n"
+    
+    # Распределение оценок берём из той же строки сводки - без дополнительных запросов
+    if review_count:
+        for stars in range(5, 0, -1):
+            text += f"{stars} ⭐ — {summary[f'stars_{stars}']}\n"
+    text += "\n"
     
     if not reviews:
         if lang == 'ru':
@@ -2641,27 +2395,12 @@ async def show_product_reviews(callback: types.CallbackQuery, state: FSMContext)
     await callback.answer()
 
 @dp.callback_query(F.data.startswith("write_review_"))
-async def start_writing_review(callback: types.CallbackQuery, state: FSMContext):
+async def start_writing_review(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     product_id = int(callback.data.split("_")[2])
-    user = get_user(callback.from_user.id)
     lang = user['language']
     
-    # Проверяем, покупал ли пользователь этот товар
-    orders = get_user_orders(callback.from_user.id)
-    has_purchased = False
-    
-    for order in orders:
-        if order['status'] == 'delivered':  # Только доставленные заказы
-            try:
-                items = json.loads(order['items'])
-                for item in items:
-                    if item['product_id'] == product_id:
-                        has_purchased = True
-                        break
-            except:
-                pass
-    
-    if not has_purchased:
+    # Проверяем, покупал ли пользователь этот товар (только доставленные заказы)
+    if not await user_has_purchased(callback.from_user.id, product_id):
         if lang == 'ru':
             await callback.answer("❌ Вы можете оставить отзыв только на купленные товары")
         else:
@@ -2680,9 +2419,8 @@ async def start_writing_review(callback: types.CallbackQuery, state: FSMContext)
     await callback.answer()
 
 @dp.callback_query(OrderFlow.rating_product, F.data.startswith("rating_"))
-async def set_review_rating(callback: types.CallbackQuery, state: FSMContext):
+async def set_review_rating(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     rating = int(callback.data.split("_")[1])
-    user = get_user(callback.from_user.id)
     lang = user['language']
     
     await state.update_data(review_rating=rating)
@@ -2697,9 +2435,8 @@ async def set_review_rating(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @dp.message(OrderFlow.writing_review)
-async def save_review_text(message: types.Message, state: FSMContext):
+async def save_review_text(message: types.Message, state: FSMContext, user: sqlite3.Row):
     data = await state.get_data()
-    user = get_user(message.from_user.id)
     lang = user['language']
     
     review_text = message.text.strip()
@@ -2719,7 +2456,7 @@ async def save_review_text(message: types.Message, state: FSMContext):
         return
     
     # Сохраняем отзыв
-    add_review(
+    await add_review(
         user_id=message.from_user.id,
         user_name=user['name'],
         product_id=data['review_product_id'],
@@ -2736,10 +2473,9 @@ async def save_review_text(message: types.Message, state: FSMContext):
     await state.set_state(OrderFlow.main_menu)
 
 @dp.callback_query(F.data == "my_reviews")
-async def show_my_reviews(callback: types.CallbackQuery, state: FSMContext):
-    user = get_user(callback.from_user.id)
+async def show_my_reviews(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     lang = user['language']
-    reviews = get_user_reviews(callback.from_user.id)
+    reviews = await get_user_reviews(callback.from_user.id)
     
     if lang == 'ru':
         text = "📝 **Мои отзывы:**\n\n"
@@ -2770,31 +2506,29 @@ async def show_my_reviews(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @dp.callback_query(F.data == "back_to_main")
-async def back_to_main_from_reviews(callback: types.CallbackQuery, state: FSMContext):
-    user = get_user(callback.from_user.id)
+async def back_to_main_from_reviews(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     await callback.message.answer("🏠 Меню" if user['language'] == 'ru' else "🏠 Menu", 
                                 reply_markup=get_main_menu(user['language']))
     await state.set_state(OrderFlow.main_menu)
     await callback.answer()
 
 @dp.callback_query(F.data.startswith("addtocart_"))
-async def add_to_cart_handler(callback: types.CallbackQuery, state: FSMContext):
+async def add_to_cart_handler(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     product_id = int(callback.data.split("_")[1])
-    user = get_user(callback.from_user.id)
     
-    add_to_cart(callback.from_user.id, product_id)
+    await add_to_cart(callback.from_user.id, product_id)
     
     await callback.answer("✅ Добавлено в корзину" if user['language'] == 'ru' else "✅ Savatga qo'shildi")
-    await callback.message.edit_reply_markup(reply_markup=None)
+    if not callback.data.endswith("_keep"):
+        await callback.message.edit_reply_markup(reply_markup=None)
 
 @dp.callback_query(F.data.startswith("remove_"))
-async def remove_from_cart_handler(callback: types.CallbackQuery, state: FSMContext):
+async def remove_from_cart_handler(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
     product_id = int(callback.data.split("_")[1])
-    user = get_user(callback.from_user.id)
     
-    remove_from_cart(callback.from_user.id, product_id)
+    await remove_from_cart(callback.from_user.id, product_id)
     
-    cart_items = get_cart_items(callback.from_user.id)
+    cart_items = await get_cart_items(callback.from_user.id)
     if cart_items:
         total = sum(item['price'] * item['quantity'] for item in cart_items)
         text = "🛒 Ваша корзина:\n\n"
@@ -2810,16 +2544,14 @@ async def remove_from_cart_handler(callback: types.CallbackQuery, state: FSMCont
     await callback.answer("✅ Удалено из корзины" if user['language'] == 'ru' else "✅ Savatdan olib tashlandi")
 
 @dp.callback_query(F.data == "clear_cart")
-async def clear_cart_handler(callback: types.CallbackQuery, state: FSMContext):
-    user = get_user(callback.from_user.id)
-    clear_cart(callback.from_user.id)
+async def clear_cart_handler(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    await clear_cart(callback.from_user.id)
     await callback.message.edit_text("🧹 Корзина очищена" if user['language'] == 'ru' else "🧹 Savat tozalandi")
     await callback.answer()
 
 @dp.callback_query(F.data == "checkout")
-async def checkout_handler(callback: types.CallbackQuery, state: FSMContext):
-    user = get_user(callback.from_user.id)
-    cart_items = get_cart_items(callback.from_user.id)
+async def checkout_handler(callback: types.CallbackQuery, state: FSMContext, user: sqlite3.Row):
+    cart_items = await get_cart_items(callback.from_user.id)
     
     if not cart_items:
         await callback.answer("❌ Корзина пуста")
@@ -2827,8 +2559,6 @@ async def checkout_handler(callback: types.CallbackQuery, state: FSMContext):
     
     total = sum(item['price'] * item['quantity'] for item in cart_items)
     
-    await state.update_data(cart_items=[dict(item) for item in cart_items])
-    
     await callback.message.answer(
         f"💰 К оплате: {total} UZS\n\n"
         f"💳 Карта для оплаты: `{CARD_NUMBER}`\n\n"
@@ -2840,51 +2570,32 @@ async def checkout_handler(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @dp.message(OrderFlow.waiting_receipt, F.photo)
-async def process_receipt(message: types.Message, state: FSMContext):
-    data = await state.get_data()
-    cart_items = data.get('cart_items', [])
-    
-    if not cart_items:
+async def process_receipt(message: types.Message, state: FSMContext, user: sqlite3.Row):
+    result = await checkout(message.from_user.id, message.photo[-1].file_id)
+    if result is None:
         await message.answer("❌ Ошибка: корзина пуста")
         return
     
-    user = get_user(message.from_user.id)
-    total = sum(item['price'] * item['quantity'] for item in cart_items)
+    order_id, total, order_items = result
     
-    order_items = []
-    for item in cart_items:
-        order_items.append({
-            'product_id': item['product_id'],
-            'name': item['name_ru'] if user['language'] == 'ru' else item['name_uz'],
-            'quantity': item['quantity'],
-            'price': item['price']
-        })
-    
-    order_id = create_order(message.from_user.id, order_items, total, status='waiting_confirm')
-    update_order_receipt(order_id, message.photo[-1].file_id)
-    
-    clear_cart(message.from_user.id)
-    
-    for admin_id in ADMIN_IDS:
-        try:
-            items_text = "\n".join([f"• {item['name']} x{item['quantity']}" for item in order_items])
-            await bot.send_photo(
-                admin_id, 
-                message.photo[-1].file_id, 
-                caption=f"🆕 НОВЫЙ ЗАКАЗ #{order_id}\n"
-                       f"👤 Пользователь: {message.from_user.id} (@{message.from_user.username})\n"
-                       f"📦 Товары:\n{items_text}\n"
-                       f"💰 Сумма: {total} UZS\n"
-                       f"📊 Статус: Ожидает подтверждения"
-            )
-        except Exception as e:
-            logger.error(f"Error sending to admin {admin_id}: {e}")
-
     await message.answer(
         "✅ Чек принят! Заказ ожидает подтверждения.\n"
         "Статус можно отслеживать в разделе 'Мои заказы'.",
         reply_markup=get_main_menu(user['language'])
     )
+    
+    # Админов уведомляем в фоне: ответ покупателю не ждёт рассылки
+    name_field = 'name_ru' if user['language'] == 'ru' else 'name_uz'
+    items_text = "\n".join([f"• {item[name_field]} x{item['quantity']}" for item in order_items])
+    run_in_background(notify_admins(
+        message.photo[-1].file_id,
+        f"🆕 НОВЫЙ ЗАКАЗ #{order_id}\n"
+        f"👤 Пользователь: {message.from_user.id} (@{message.from_user.username})\n"
+        f"📦 Товары:\n{items_text}\n"
+        f"💰 Сумма: {total} UZS\n"
+        f"📊 Статус: Ожидает подтверждения"
+    ))
+    
     await state.set_state(OrderFlow.main_menu)
 
 # ================== ЛОГИКА: АДМИНКА ==================
@@ -2907,15 +2618,22 @@ async def admin_manage_products(message: types.Message, state: FSMContext):
 
 @dp.message(OrderFlow.admin_home, F.text == "📋 Все заказы")
 async def admin_view_orders(message: types.Message, state: FSMContext):
-    orders = get_all_orders()
+    orders, has_newer, has_older = await get_orders_page()
     if not orders:
         await message.answer("📦 Заказов пока нет")
         return
     
-    text = "📋 Все заказы:\n\n"
-    for order in orders[:10]:
-        user_info = get_user(order['user_id'])
-        username = f"@{user_info['name']}" if user_info else f"ID: {order['user_id']}"
+    text, kb = admin_orders_page(orders, "all", has_newer, has_older)
+    await message.answer(text, reply_markup=kb)
+    await state.set_state(OrderFlow.admin_viewing_orders)
+
+def admin_orders_page(orders, status_filter, has_newer, has_older):
+    title = "Все заказы" if status_filter == "all" else ORDER_STATUSES[status_filter]['ru']
+    text = f"📋 {title}:\n\n"
+    if not orders:
+        text += "📦 Заказов нет"
+    for order in orders:
+        username = f"@{order['user_name']}" if order['user_name'] else f"ID: {order['user_id']}"
         status_text = ORDER_STATUSES.get(order['status'], {}).get('ru', order['status'])
         
         text += f"📦 Заказ #{order['id']}\n"
@@ -2925,8 +2643,35 @@ async def admin_view_orders(message: types.Message, state: FSMContext):
         text += f"📅 {order['created_at'][:10]}\n"
         text += f"📝 Управление: /order_{order['id']}\n\n"
     
-    await message.answer(text)
-    await state.set_state(OrderFlow.admin_viewing_orders)
+    kb = get_admin_orders_kb(status_filter, orders[0]['id'] if has_newer else None, 
+                             orders[-1]['id'] if has_older else None)
+    return text, kb
+
+@dp.callback_query(F.data.startswith("aorders_"))
+async def admin_orders_navigate(callback: types.CallbackQuery, state: FSMContext):
+    if callback.from_user.id not in ADMIN_IDS:
+        return await callback.answer()
+    
+    # aorders_<фильтр>_<first|newer|older>_<id>; в статусах есть "_", поэтому режем справа
+    prefix, direction, order_id = callback.data.rsplit("_", 2)
+    status_filter = prefix[len("aorders_"):]
+    if status_filter != "all" and status_filter not in ORDER_STATUSES:
+        return await callback.answer()
+    
+    status = None if status_filter == "all" else status_filter
+    if direction == "first":
+        orders, has_newer, has_older = await get_orders_page(status)
+    else:
+        orders, has_newer, has_older = await get_orders_page(status, int(order_id), direction)
+        if not orders:
+            return await callback.answer()
+    
+    text, kb = admin_orders_page(orders, status_filter, has_newer, has_older)
+    try:
+        await callback.message.edit_text(text, reply_markup=kb)
+    except TelegramBadRequest:
+        pass  # тот же фильтр нажат повторно - сообщение не изменилось
+    await callback.answer()
 
 @dp.message(OrderFlow.admin_home, F.text == "📊 Статистика")
 async def admin_statistics(message: types.Message, state: FSMContext):
@@ -2978,7 +2723,7 @@ async def admin_prod_category(message: types.Message, state: FSMContext):
 @dp.message(OrderFlow.admin_adding_product_photo, F.photo)
 async def admin_prod_finish(message: types.Message, state: FSMContext):
     data = await state.get_data()
-    add_product(
+    await add_product(
         data['new_prod_name'], 
         data['new_prod_price'], 
         data['category_ru'], 
@@ -2992,7 +2737,7 @@ async def admin_prod_finish(message: types.Message, state: FSMContext):
 # Управление товарами
 @dp.callback_query(OrderFlow.admin_managing_products, F.data == "edit_products")
 async def edit_products_list(callback: types.CallbackQuery, state: FSMContext):
-    products = get_all_products()
+    products = catalog_cache.all_products()
     if not products:
         await callback.message.edit_text("📦 Товаров нет")
         return
@@ -3004,7 +2749,7 @@ async def edit_products_list(callback: types.CallbackQuery, state: FSMContext):
 
 @dp.callback_query(OrderFlow.admin_managing_products, F.data == "delete_products")
 async def delete_products_list(callback: types.CallbackQuery, state: FSMContext):
-    products = get_all_products()
+    products = catalog_cache.all_products()
     if not products:
         await callback.message.edit_text("📦 Товаров нет")
         return
@@ -3017,7 +2762,7 @@ async def delete_products_list(callback: types.CallbackQuery, state: FSMContext)
 @dp.callback_query(OrderFlow.admin_managing_products, F.data.startswith("edit_"))
 async def edit_product(callback: types.CallbackQuery, state: FSMContext):
     product_id = int(callback.data.split("_")[1])
-    product = get_product_by_id(product_id)
+    product = await catalog_cache.get_product(product_id)
     
     if not product:
         await callback.answer("❌ Товар не найден")
@@ -3039,19 +2784,19 @@ async def process_edit_product(message: types.Message, state: FSMContext):
     product_id = data['editing_product_id']
     
     if message.text.isdigit():
-        update_product(product_id, 'price', int(message.text))
+        await update_product(product_id, 'price', int(message.text))
         await message.answer(f"✅ Цена обновлена: {message.text} UZS", reply_markup=get_admin_kb())
         await state.set_state(OrderFlow.admin_home)
     else:
-        update_product(product_id, 'name_ru', message.text)
-        update_product(product_id, 'name_uz', message.text)
+        await update_product(product_id, 'name_ru', message.text)
+        await update_product(product_id, 'name_uz', message.text)
         await message.answer(f"✅ Название обновлено", reply_markup=get_admin_kb())
         await state.set_state(OrderFlow.admin_home)
 
 @dp.callback_query(OrderFlow.admin_managing_products, F.data.startswith("delete_"))
 async def delete_product_handler(callback: types.CallbackQuery, state: FSMContext):
     product_id = int(callback.data.split("_")[1])
-    delete_product(product_id)
+    await delete_product(product_id)
     
     await callback.message.edit_text("✅ Товар удален (скрыт из каталога)")
     await callback.answer()
@@ -3076,24 +2821,21 @@ async def manage_order_command(message: types.Message, state: FSMContext):
     
     try:
         order_id = int(message.text.split("_")[1])
-    except:
+    except (IndexError, ValueError):
         await message.answer("❌ Неверный формат команды")
         return
     
-    order = get_order_by_id(order_id)
+    order = await get_order_by_id(order_id)
     if not order:
         await message.answer("❌ Заказ не найден")
         return
     
-    user_info = get_user(order['user_id'])
+    user_info = await get_cached_user(order['user_id'])
     username = f"@{user_info['name']}" if user_info else f"ID: {order['user_id']}"
     status_text = ORDER_STATUSES.get(order['status'], {}).get('ru', order['status'])
     
-    try:
-        items = json.loads(order['items'])
-        items_text = "\n".join([f"• {item['name']} x{item['quantity']} ({item['price']} UZS)" for item in items])
-    except:
-        items_text = order['items']
+    items = await get_order_items(order_id)
+    items_text = "\n".join([f"• {item['name_ru']} x{item['quantity']} ({item['unit_price']} UZS)" for item in items])
     
     text = f"📦 Заказ #{order_id}\n"
     text += f"👤 Пользователь: {username}\n"
@@ -3110,12 +2852,12 @@ async def set_order_status(callback: types.CallbackQuery, state: FSMContext):
     _, order_id, new_status = callback.data.split("_")
     order_id = int(order_id)
     
-    update_order_status(order_id, new_status)
+    await update_order_status(order_id, new_status)
     status_text = ORDER_STATUSES.get(new_status, {}).get('ru', new_status)
     
-    order = get_order_by_id(order_id)
+    order = await get_order_by_id(order_id)
     if order:
-        user = get_user(order['user_id'])
+        user = await get_cached_user(order['user_id'])
         if user:
             lang = user['language']
             status_user_text = ORDER_STATUSES.get(new_status, {}).get(lang, new_status)
@@ -3126,32 +2868,205 @@ async def set_order_status(callback: types.CallbackQuery, state: FSMContext):
                     f"🔄 Новый статус: {status_user_text}\n"
                     f"💰 Сумма: {order['total_price']} UZS"
                 )
-            except:
-                pass
+            except TelegramAPIError as e:
+                logger.error(f"Не удалось уведомить {order['user_id']} о статусе заказа #{order_id}: {e}")
     
     await callback.message.edit_text(f"✅ Статус заказа #{order_id} изменен на: {status_text}")
     await callback.answer()
 
-# Статистика
-@dp.callback_query(OrderFlow.admin_statistics, F.data == "stats_current")
-async def show_current_stats(callback: types.CallbackQuery, state: FSMContext):
-    stats = get_monthly_statistics()
+# Справочник почтовых отделений
+@dp.message(Command("upload_geo"))
+async def upload_geo_command(message: types.Message, state: FSMContext):
+    if message.from_user.id not in ADMIN_IDS:
+        return
     
-    if not stats or stats['total_orders'] == 0:
-        await callback.message.edit_text("📊 Нет данных за текущий месяц")
+    await message.answer("📎 Отправьте JSON-файл справочника с разделами regions и post_offices", 
+                         reply_markup=ReplyKeyboardRemove())
+    await state.set_state(OrderFlow.admin_uploading_geo)
+
+@dp.message(OrderFlow.admin_uploading_geo, F.document)
+async def upload_geo_file(message: types.Message, state: FSMContext):
+    if message.from_user.id not in ADMIN_IDS:
         return
     
-    text = f"📊 Статистика за текущий месяц:\n\n"
+    try:
+        file = await bot.download(message.document)
+        dataset = json.load(file)
+        snapshot = await asyncio.to_thread(geo_store.publish, dataset)
+    except (ValueError, OSError) as e:
+        return await message.answer(f"❌ Справочник не принят: {e}")
+    
+    get_region_keyboard.cache_clear()
+    get_post_keyboard.cache_clear()
+    
+    offices_count = sum(len(offices) for by_lang in dataset['post_offices'].values() for offices in by_lang.values())
+    await message.answer(f"✅ Справочник обновлён (версия {snapshot.version})\n"
+                         f"🏙 Регионов: {len(dataset['regions'][LANGUAGES[0]])}\n"
+                         f"📮 Отделений: {offices_count}", reply_markup=get_admin_kb())
+    await state.set_state(OrderFlow.admin_home)
+
+# Рассылки
+@dp.message(OrderFlow.admin_home, F.text == "📢 Рассылка")
+async def admin_broadcast_start(message: types.Message, state: FSMContext):
+    await message.answer("📢 Кому отправить рассылку?", reply_markup=get_broadcast_audience_kb())
+    await state.set_state(OrderFlow.admin_broadcast_audience)
+
+@dp.message(OrderFlow.admin_broadcast_audience)
+async def admin_broadcast_audience(message: types.Message, state: FSMContext):
+    if message.text == "🔙 Назад":
+        await message.answer("🛠 Админ-панель", reply_markup=get_admin_kb())
+        return await state.set_state(OrderFlow.admin_home)
+    
+    if message.text == "📍 По региону":
+        await message.answer("📍 Выберите регион:", reply_markup=get_region_keyboard('ru'))
+        return await state.set_state(OrderFlow.admin_broadcast_region)
+    
+    if message.text not in BROADCAST_AUDIENCES:
+        return await message.answer("❌ Выберите из списка")
+    
+    await state.update_data(broadcast_language=BROADCAST_AUDIENCES[message.text], broadcast_region=None)
+    await message.answer("✍️ Введите текст рассылки:", reply_markup=ReplyKeyboardRemove())
+    await state.set_state(OrderFlow.admin_broadcast_text)
+
+@dp.message(OrderFlow.admin_broadcast_region)
+async def admin_broadcast_region(message: types.Message, state: FSMContext):
+    region = geo_store.region_by_text(message.text)
+    if not region:
+        return await message.answer("❌ Выберите из списка")
+    
+    await state.update_data(broadcast_language=None, broadcast_region=region)
+    await message.answer("✍️ Введите текст рассылки:", reply_markup=ReplyKeyboardRemove())
+    await state.set_state(OrderFlow.admin_broadcast_text)
+
+@dp.message(OrderFlow.admin_broadcast_text)
+async def admin_broadcast_text(message: types.Message, state: FSMContext):
+    if not message.text:
+        return await message.answer("❌ Нужен текст")
+    
+    data = await state.get_data()
+    recipients = await count_broadcast_recipients(data['broadcast_language'], data['broadcast_region'])
+    await state.update_data(broadcast_text=message.text)
+    await message.answer(f"{message.text}\n\n———\n👥 Получателей: {recipients}\nОтправить?", 
+                         reply_markup=get_broadcast_confirm_kb())
+    await state.set_state(OrderFlow.admin_broadcast_confirm)
+
+@dp.callback_query(OrderFlow.admin_broadcast_confirm, F.data.in_({"broadcast_confirm", "broadcast_cancel"}))
+async def admin_broadcast_confirm(callback: types.CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    if callback.data == "broadcast_confirm":
+        broadcast_id = await create_broadcast(callback.from_user.id, data['broadcast_text'],
+                                              data['broadcast_language'], data['broadcast_region'])
+        start_broadcast(broadcast_id)
+        await callback.message.edit_text(f"🚀 Рассылка #{broadcast_id} запущена\n"
+                                         f"📊 Прогресс: /broadcast_{broadcast_id}")
+    else:
+        await callback.message.edit_text("❌ Рассылка отменена")
+    
+    await callback.message.answer("🛠 Админ-панель", reply_markup=get_admin_kb())
+    await state.set_state(OrderFlow.admin_home)
+    await callback.answer()
+
+@dp.message(F.text.startswith("/broadcast_"))
+async def broadcast_status_command(message: types.Message, state: FSMContext):
+    if message.from_user.id not in ADMIN_IDS:
+        return
+    
+    # /broadcast_<id> - прогресс, /broadcast_stop_<id> - остановка
+    parts = message.text.split("_")
+    try:
+        broadcast_id = int(parts[-1])
+    except ValueError:
+        return await message.answer("❌ Неверный формат команды")
+    
+    if parts[1] == "stop":
+        if await finish_broadcast(broadcast_id, 'cancelled'):
+            task = _broadcast_tasks.get(broadcast_id)
+            if task:
+                task.cancel()
+    
+    broadcast = await get_broadcast(broadcast_id)
+    if not broadcast:
+        return await message.answer("❌ Рассылка не найдена")
+    
+    text = broadcast_status_text(broadcast)
+    if broadcast['status'] == 'running':
+        text += f"\n\n⏹ Остановить: /broadcast_stop_{broadcast_id}"
+    await message.answer(text)
+
+@dp.message(Command("rebuild_ratings"))
+async def rebuild_ratings_command(message: types.Message, state: FSMContext):
+    if message.from_user.id not in ADMIN_IDS:
+        return
+    
+    await rebuild_rating_summaries()
+    await message.answer("✅ Рейтинги товаров пересчитаны")
+
+@dp.message(Command("rebuild_sales"))
+async def rebuild_sales_command(message: types.Message, state: FSMContext):
+    if message.from_user.id not in ADMIN_IDS:
+        return
+    
+    await rebuild_daily_sales()
+    await message.answer("✅ Дневная сводка продаж пересчитана")
+
+# Статистика
+def format_order_stats(title, stats):
+    if not stats or stats['total_orders'] == 0:
+        return f"📊 Нет данных за {title}"
+    
+    text = f"📊 Статистика за {title}:\n\n"
     text += f"📦 Всего заказов: {stats['total_orders']}\n"
     text += f"✅ Доставлено заказов: {stats['delivered_orders']}\n"
     text += f"💰 Общая выручка: {stats['total_revenue'] or 0} UZS\n"
     text += f"📈 Средний чек: {int(stats['avg_order_value'] or 0)} UZS"
-    
-    await callback.message.edit_text(text)
+    return text
+
+@dp.callback_query(OrderFlow.admin_statistics, F.data.startswith("stats_period_"))
+async def show_period_stats(callback: types.CallbackQuery, state: FSMContext):
+    period = callback.data[len("stats_period_"):]
+    if period not in STATS_PERIODS:
+        return await callback.answer()
+    
+    start, end = period_range(period)
+    text = format_order_stats(STATS_PERIODS[period], await get_order_statistics(start, end))
+    if period == 'year':
+        months = await get_sales_by_month(start, end)
+        if months:
+            text += "\n\n🗓 По месяцам:\n"
+            for row in months:
+                text += f"{row['month']}: 📦 {row['total_orders']} / ✅ {row['delivered_orders']} / 💰 {row['total_revenue']} UZS\n"
+    try:
+        await callback.message.edit_text(text, reply_markup=get_statistics_kb())
+    except TelegramBadRequest:
+        pass  # тот же период нажат повторно - текст не изменился
+    await callback.answer()
+
+@dp.callback_query(OrderFlow.admin_statistics, F.data == "stats_custom")
+async def ask_custom_stats_range(callback: types.CallbackQuery, state: FSMContext):
+    await callback.message.answer("📆 Введите период в формате ДД.ММ.ГГГГ-ДД.ММ.ГГГГ (или одну дату):")
+    await state.set_state(OrderFlow.admin_stats_custom_range)
+    await callback.answer()
+
+@dp.message(OrderFlow.admin_stats_custom_range)
+async def show_custom_stats(message: types.Message, state: FSMContext):
+    # Обе даты включительно; в запрос уходит полуинтервал [first, last + 1 день)
+    try:
+        first, _, last = (message.text or "").partition("-")
+        start = datetime.strptime(first.strip(), "%d.%m.%Y")
+        end = datetime.strptime(last.strip(), "%d.%m.%Y") if last else start
+    except ValueError:
+        return await message.answer("❌ Неверный формат. Пример: 01.09.2025-30.09.2025")
+    if end < start:
+        return await message.answer("❌ Начало периода позже конца")
+    
+    stats = await get_order_statistics(start, end + timedelta(days=1))
+    title = f"{start:%d.%m.%Y}" if start == end else f"{start:%d.%m.%Y} - {end:%d.%m.%Y}"
+    await message.answer(format_order_stats(title, stats), reply_markup=get_statistics_kb())
+    await state.set_state(OrderFlow.admin_statistics)
 
 @dp.callback_query(OrderFlow.admin_statistics, F.data == "stats_products")
 async def show_product_stats(callback: types.CallbackQuery, state: FSMContext):
-    stats = get_product_statistics()
+    stats = await get_product_statistics()
     
     if not stats:
         await callback.message.edit_text("📦 Нет данных по продажам товаров")
@@ -3169,22 +3084,68 @@ async def show_product_stats(callback: types.CallbackQuery, state: FSMContext):
 async def handle_ping(request):
     return web.Response(text="Bot is alive!")
 
+async def handle_health(request):
+    return web.json_response({'status': 'ok', 'send_queue': send_scheduler.stats()})
+
+webhook_handler = None
+
 async def start_web_server():
+    global webhook_handler
     app = web.Application()
     app.router.add_get("/", handle_ping)
+    app.router.add_get("/health", handle_health)
+    if BOT_MODE == "webhook":
+        # Запросы без правильного X-Telegram-Bot-Api-Secret-Token отклоняются с 401
+        webhook_handler = SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=WEBHOOK_SECRET)
+        webhook_handler.register(app, path=WEBHOOK_PATH)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", PORT)
     await site.start()
+    return runner
 
 # ================== ЗАПУСК ==================
 async def main():
-    setup_database()
-    await start_web_server()
-    
-    print("🚀 Бот запущен...")
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    if BOT_MODE == "webhook" and not WEBHOOK_HOST:
+        raise RuntimeError("Для BOT_MODE=webhook нужен WEBHOOK_HOST или RENDER_EXTERNAL_HOSTNAME")
+    
+    db_write_executor.submit(setup_database).result()
+    warm_up_db_pool()
+    writer_task = asyncio.create_task(db_writer_loop())
+    await catalog_cache.rebuild()
+    storage.start()
+    await resume_broadcasts()
+    runner = await start_web_server()
+    
+    print(f"🚀 Бот запущен ({BOT_MODE})...")
+    try:
+        if BOT_MODE == "webhook":
+            # Накопившиеся апдейты не сбрасываем: на Render бот будит как раз первый запрос
+            await bot.set_webhook(f"https://{WEBHOOK_HOST}{WEBHOOK_PATH}",
+                                  secret_token=WEBHOOK_SECRET,
+                                  max_connections=WEBHOOK_MAX_CONNECTIONS,
+                                  allowed_updates=dp.resolve_used_update_types())
+            # Render останавливает сервис SIGTERM-ом: ждём сигнала, чтобы finally успел сбросить
+            # состояния FSM, очередь записи и прогресс рассылок
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(sig, stop_event.set)
+            await stop_event.wait()
+        else:
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot)
+    finally:
+        await runner.cleanup()
+        if webhook_handler:
+            # Telegram уже получил 200 на эти апдейты: дорабатываем их, пока живы очередь записи и FSM
+            await asyncio.gather(*list(webhook_handler._background_feed_update_tasks), return_exceptions=True)
+        await stop_broadcasts()
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+        await storage.close()
+        await stop_db_writer(writer_task)
+        close_db_pool()
+        await bot.session.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import unittest
+
+os.environ.setdefault("API_TOKEN", "123456:TEST")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot as shop
+from aiogram.methods import EditMessageMedia, SendMediaGroup, SendMessage
+from aiogram.types import InputMediaPhoto
+
+
+class SendSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = shop.SendScheduler()
+        self.sent = []
+
+    async def make_request(self, bot, method):
+        self.sent.append(method)
+        return True
+
+    async def test_edit_media_passes_through(self):
+        method = EditMessageMedia(chat_id=1, message_id=1, media=InputMediaPhoto(media="photo"))
+        self.assertTrue(await self.scheduler(self.make_request, shop.bot, method))
+        self.assertEqual(self.sent, [method])
+
+    async def test_album_pages_do_not_wait_for_chat_bucket(self):
+        album = SendMediaGroup(chat_id=1, media=[InputMediaPhoto(media=f"p{i}") for i in range(10)])
+        started = time.monotonic()
+        await self.scheduler(self.make_request, shop.bot, album)
+        await self.scheduler(self.make_request, shop.bot, SendMessage(chat_id=1, text="nav"))
+        self.assertLess(time.monotonic() - started, 0.5)
+        # В общем лимите альбом всё равно стоит 10 сообщений
+        self.assertLessEqual(self.scheduler.global_bucket.tokens, shop.SEND_GLOBAL_RATE - 11 + 0.1)
+
+    def test_retry_after_pauses_only_its_chat(self):
+        self.scheduler._on_retry_after(1, 5)
+        now = time.monotonic()
+        self.assertGreater(self.scheduler._chat_bucket(1).paused_until, now)
+        self.assertEqual(self.scheduler._chat_bucket(2).paused_until, 0)
+        self.assertEqual(self.scheduler.global_bucket.paused_until, 0)
+
+    def test_retry_after_in_many_chats_pauses_everything(self):
+        for chat_id in range(shop.SEND_FLOOD_CHATS):
+            self.scheduler._on_retry_after(chat_id, 5)
+        self.assertGreater(self.scheduler.global_bucket.paused_until, time.monotonic())
+
+
+if __name__ == "__main__":
+    unittest.main()